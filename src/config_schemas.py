@@ -63,6 +63,7 @@ class ConfigSchema:
                     "PageAutoRefresh": {"type": "number", "required": False, "nullable": True, "min": 1, "max": 3600},
                     "DebugMode": {"type": "boolean", "required": False, "nullable": True},
                     "AccessKey": {"type": "string", "required": False, "nullable": True},
+                    "BroadcastMinIntervalMs": {"type": "number", "required": False, "nullable": True, "min": 0, "max": 10000},
                 },
             },
             "OutputMetering": {
@@ -385,7 +386,8 @@ class ConfigSchema:
                             "type": "dict",
                             "schema": {
                                 "Name": {"type": "string", "required": True},
-                                "Script": {"type": "string", "required": True},
+                                "Script": {"type": "string", "required": False, "nullable": True},
+                                "NUTDevice": {"type": "string", "required": False, "nullable": True},
                                 "MinRuntimeWhenDischarging": {"type": "number", "required": False, "nullable": True, "min": 0},
                                 "MinChargeWhenDischarging": {"type": "number", "required": False, "nullable": True, "min": 0, "max": 100},
                                 "MinRuntimeWhenCharging": {"type": "number", "required": False, "nullable": True, "min": 0},
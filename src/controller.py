@@ -108,6 +108,7 @@ class PowerController:
 
         # Setup the environment
         self.outputs = []   # List of output state managers, each one a OutputStateManager object.
+        self.valid_output_ids: frozenset[str] = frozenset()  # The ids of self.outputs, replaced on each (re)initialise
         self.poll_interval = 10.0
         self.last_tick_time = DateHelper.now()
         self._smart_device_sequence_requests: dict[str, DeviceSequenceRequest] = {}
@@ -135,6 +136,7 @@ class PowerController:
 
         # DataAPI related
         self.data_api_data: dict = {}   # Safe copy of the latest data
+        self.data_api_generation: int = 0  # Bumped each time data_api_data is replaced, so the Data API can cache responses
         self._data_api_lock = threading.Lock()  # Thread safe lock to prevent concurrent access to the data_api_data
         self._data_api_config: dict = {}
         self._data_api_next_refresh: dt.datetime = DateHelper.now()
@@ -153,6 +155,12 @@ class PowerController:
         # This is set by main.py once the ASGI webapp is initialised.
         self._webapp_notify: Callable[[], None] | None = None
         self._last_webapp_notify: dt.datetime | None = None
+        # Bumped whenever the state behind get_webapp_data() may have changed, so the webapp can cache snapshots.
+        self.webapp_state_version: int = 0
+        self._webapp_state_lock = threading.Lock()  # Bumps come from both the web thread and the controller thread
+        # (webapp_state_version, snapshot) built by the controller thread after each tick while the webapp is running.
+        # Replaced, never mutated, so the webapp can read it without a lock.
+        self.published_webapp_data: tuple[int, dict] | None = None
 
         self._initialise(startup_mode=True)
         self.update_device_locations = True
@@ -172,6 +180,29 @@ class PowerController:
             time.sleep(0.1)  # Small delay to let the commands be processed
             loop_count += 1
 
+        return self._build_webapp_data()
+
+    def _publish_webapp_data(self) -> None:
+        """Build a webapp snapshot on the controller thread and publish it in published_webapp_data."""
+        # Read the version first, so a change during the build leaves the published snapshot marked stale
+        version = self.webapp_state_version
+        # A command posted since the tick drained the queue has already bumped the version, but it hasn't been
+        # applied yet. Don't publish a snapshot without it - get_webapp_data() waits for pending commands instead.
+        if self._have_pending_commands():
+            return
+        self.published_webapp_data = (version, self._build_webapp_data())
+
+    def _bump_webapp_state_version(self) -> None:
+        """Mark the state behind get_webapp_data() as changed, so cached and published snapshots are stale."""
+        with self._webapp_state_lock:
+            self.webapp_state_version += 1
+
+    def _build_webapp_data(self) -> dict:
+        """Build the snapshot returned by get_webapp_data().
+
+        Returns:
+            dict: The state snapshot containing the outputs.
+        """
         view = self._get_latest_status_view()
 
         temp_probe_data = []
@@ -224,12 +255,13 @@ class PowerController:
         if not isinstance(output_id, str):
             return False
 
-        return any(output.id == output_id for output in self.outputs)
+        return output_id in self.valid_output_ids
 
     def post_command(self, cmd: Command) -> None:
         """Post a command to the controller from the web app."""
         self.cmd_q.put(cmd)
         self.command_pending: bool = True
+        self._bump_webapp_state_version()
         self.wake_event.set()
 
     def set_wake_event(self, seq_result: DeviceSequenceRequest) -> None:
@@ -257,6 +289,9 @@ class PowerController:
             self.run_self_tests(is_new_day)
 
             force_refresh = self._run_scheduler_tick(is_new_day)
+            self._bump_webapp_state_version()
+            if self._webapp_notify is not None:
+                self._publish_webapp_data()
             # Push updates periodically and immediately after commands.
             self._maybe_notify_webapp(force=force_refresh)
             self.wake_event.clear()
@@ -279,6 +314,7 @@ class PowerController:
 
             view = self._get_latest_status_view()
             self._save_system_state(view, force_post=True)
+            self.ups_integration.close()
             self.logger.log_message("PowerController shutdown complete.", "detailed")
 
     def print_to_console(self, message: str):
@@ -528,6 +564,7 @@ class PowerController:
 
         # Sort outputs so parents are evaluated first
         list.sort(self.outputs, key=lambda x: not x.is_parent)
+        self.valid_output_ids = frozenset(output.id for output in self.outputs)
 
         # Temp probe logging
         self.temp_probe_logging = self._configure_temp_probe_logging(saved_state, view)
@@ -1388,7 +1425,7 @@ class PowerController:
         import_start_date = (DateHelper.now() - dt.timedelta(days=self.tesla_charge_data_days_of_history)).date()
 
         try:
-            charging_data = get_charging_data_as_dict(self.config, start_date=import_start_date, convert_to_local=True)
+            charging_data = get_charging_data_as_dict(self.config, start_date=import_start_date, convert_to_local=True, include_address=False)
             if charging_data:
                 self.logger.log_message(f"Imported {len(charging_data['sessions'])} charging sessions from TeslaMate starting from {import_start_date}.", "debug")
 
@@ -1532,6 +1569,7 @@ class PowerController:
                 "EnergyPrices": {},
                 "LastRefresh": None,
             }
+            self.data_api_generation += 1
             self._data_api_next_refresh = DateHelper.now()
 
     def _refresh_api_data_if_needed(self, view: SmartDeviceView):  # noqa: PLR0914
@@ -1630,3 +1668,4 @@ class PowerController:
         # Update the data API cache with the new data in JSON format
         with self._data_api_lock:
             self.data_api_data = copy.deepcopy(return_data_json)  # pyright: ignore[reportAttributeAccessIssue, reportAssignmentType]
+            self.data_api_generation += 1
@@ -8,12 +8,14 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import hashlib
+import hmac
 import os
 from typing import TYPE_CHECKING, Annotated
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 if TYPE_CHECKING:
     from threading import Event
@@ -50,7 +52,8 @@ def _validate_access_key(config: SCConfigManager, logger: SCLogger, key_from_req
     if not key:
         logger.log_message("DataAPI: Blank access key used.", "warning")
         return False
-    if key != expected_key:
+    # Constant time comparison so response timing doesn't reveal how much of the key matched
+    if not isinstance(expected_key, str) or not hmac.compare_digest(key.encode(), expected_key.encode()):
         logger.log_message("DataAPI: Invalid access key used.", "warning")
         return False
     return True
@@ -77,6 +80,64 @@ def _get_access_key_from_request(request: Request, access_key_param: str | None)
     return request.headers.get("X-Access-Key")
 
 
+class ResponseCache:
+    """Caches the encoded JSON body and ETag of each endpoint until the controller refreshes its API data."""
+
+    def __init__(self, controller: PowerController) -> None:
+        self._controller = controller
+        self._generation: int | None = None
+        self._bodies: dict[str | None, tuple[bytes, str]] = {}
+
+    async def get(self, entry: str | None) -> tuple[bytes, str] | None:
+        """Return the encoded response for an API data entry, building it only once per controller data refresh.
+
+        Args:
+            entry: The get_api_data() entry name, or None for all data.
+
+        Returns:
+            The (body, ETag) tuple, or None if no data is available.
+        """
+        generation = self._controller.data_api_generation
+        if generation != self._generation:
+            self._generation, self._bodies = generation, {}
+
+        cached = self._bodies.get(entry)
+        if cached is None:
+            data = await asyncio.to_thread(self._controller.get_api_data, entry)
+            if not data:
+                return None
+            # Encode exactly as JSONResponse would
+            body = bytes(JSONResponse(content=data).body)
+            cached = (body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+            # Don't cache if the data was refreshed while this was being built
+            if self._controller.data_api_generation == generation:
+                self._bodies[entry] = cached
+        return cached
+
+
+async def _api_data_response(cache: ResponseCache, request: Request, entry: str | None) -> Response:
+    """Build the response for an API data endpoint, answering 304 Not Modified if the client's copy is current.
+
+    Args:
+        cache: The app's response cache.
+        request: The incoming request.
+        entry: The get_api_data() entry name, or None for all data.
+
+    Returns:
+        Response: The JSON response, or an empty 304 response.
+
+    Raises:
+        HTTPException: If no API data is available (503).
+    """
+    cached = await cache.get(entry)
+    if cached is None:
+        raise HTTPException(status_code=503, detail="API data not available")
+    body, etag = cached
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 def create_asgi_app(controller: PowerController, config: SCConfigManager, logger: SCLogger) -> FastAPI:
     """Create and configure the FastAPI application for the Data API.
 
@@ -89,16 +150,17 @@ def create_asgi_app(controller: PowerController, config: SCConfigManager, logger
         FastAPI: Configured FastAPI application
     """
     app = FastAPI(title="PowerController Data API", version="1.0.0")
+    cache = ResponseCache(controller)
 
     @app.get("/outputs")
     async def get_outputs(
         request: Request,
         access_key: Annotated[str | None, Query(description="Access key for authentication")] = None,
-    ) -> JSONResponse:
+    ) -> Response:
         """Get output device data.
 
         Returns:
-            JSONResponse: JSON containing output data and last refresh timestamp.
+            Response: JSON containing output data and last refresh timestamp, or 304 Not Modified if unchanged since the ETag sent in If-None-Match.
 
         Raises:
             HTTPException: If access key validation fails (401).
@@ -107,20 +169,17 @@ def create_asgi_app(controller: PowerController, config: SCConfigManager, logger
         if not _validate_access_key(config, logger, key):
             raise HTTPException(status_code=401, detail="Unauthorized: Invalid or missing access key")
 
-        data = await asyncio.to_thread(controller.get_api_data, "Outputs")
-        if not data:
-            raise HTTPException(status_code=503, detail="API data not available")
-        return JSONResponse(content=data)
+        return await _api_data_response(cache, request, "Outputs")
 
     @app.get("/meters")
     async def get_meters(
         request: Request,
         access_key: Annotated[str | None, Query(description="Access key for authentication")] = None,
-    ) -> JSONResponse:
+    ) -> Response:
         """Get meter data.
 
         Returns:
-            JSONResponse: JSON containing meter data and last refresh timestamp.
+            Response: JSON containing meter data and last refresh timestamp, or 304 Not Modified if unchanged since the ETag sent in If-None-Match.
 
         Raises:
             HTTPException: If access key validation fails (401).
@@ -129,20 +188,17 @@ def create_asgi_app(controller: PowerController, config: SCConfigManager, logger
         if not _validate_access_key(config, logger, key):
             raise HTTPException(status_code=401, detail="Unauthorized: Invalid or missing access key")
 
-        data = await asyncio.to_thread(controller.get_api_data, "Meters")
-        if not data:
-            raise HTTPException(status_code=503, detail="API data not available")
-        return JSONResponse(content=data)
+        return await _api_data_response(cache, request, "Meters")
 
     @app.get("/tempprobes")
     async def get_tempprobes(
         request: Request,
         access_key: Annotated[str | None, Query(description="Access key for authentication")] = None,
-    ) -> JSONResponse:
+    ) -> Response:
         """Get temperature probe data.
 
         Returns:
-            JSONResponse: JSON containing temperature probe data and last refresh timestamp.
+            Response: JSON containing temperature probe data and last refresh timestamp, or 304 Not Modified if unchanged since the ETag sent in If-None-Match.
 
         Raises:
             HTTPException: If access key validation fails (401).
@@ -151,20 +207,17 @@ def create_asgi_app(controller: PowerController, config: SCConfigManager, logger
         if not _validate_access_key(config, logger, key):
             raise HTTPException(status_code=401, detail="Unauthorized: Invalid or missing access key")
 
-        data = await asyncio.to_thread(controller.get_api_data, "TempProbes")
-        if not data:
-            raise HTTPException(status_code=503, detail="API data not available")
-        return JSONResponse(content=data)
+        return await _api_data_response(cache, request, "TempProbes")
 
     @app.get("/energyprices")
     async def get_energyprices(
         request: Request,
         access_key: Annotated[str | None, Query(description="Access key for authentication")] = None,
-    ) -> JSONResponse:
+    ) -> Response:
         """Get energy price data.
 
         Returns:
-            JSONResponse: JSON containing energy price forecast data and last refresh timestamp.
+            Response: JSON containing energy price forecast data and last refresh timestamp, or 304 Not Modified if unchanged since the ETag sent in If-None-Match.
 
         Raises:
             HTTPException: If access key validation fails (401).
@@ -173,33 +226,26 @@ def create_asgi_app(controller: PowerController, config: SCConfigManager, logger
         if not _validate_access_key(config, logger, key):
             raise HTTPException(status_code=401, detail="Unauthorized: Invalid or missing access key")
 
-        data = await asyncio.to_thread(controller.get_api_data, "EnergyPrices")
-        if not data:
-            raise HTTPException(status_code=503, detail="API data not available")
-        return JSONResponse(content=data)
+        return await _api_data_response(cache, request, "EnergyPrices")
 
     @app.get("/all")
     async def get_all(
         request: Request,
         access_key: Annotated[str | None, Query(description="Access key for authentication")] = None,
-    ) -> JSONResponse:
+    ) -> Response:
         """Get all available data.
 
         Returns:
-            JSONResponse: JSON containing all data categories and last refresh timestamp.
+            Response: JSON containing all data categories and last refresh timestamp, or 304 Not Modified if unchanged since the ETag sent in If-None-Match.
 
         Raises:
             HTTPException: If access key validation fails (401).
         """
         key = _get_access_key_from_request(request, access_key)
-        logger.log_message(f"Received request for /all endpoint with access key: {'present' if key else 'missing'}", "debug")
         if not _validate_access_key(config, logger, key):
             raise HTTPException(status_code=401, detail="Unauthorized: Invalid or missing access key")
 
-        data = await asyncio.to_thread(controller.get_api_data)
-        if not data:
-            raise HTTPException(status_code=503, detail="API data not available")
-        return JSONResponse(content=data)
+        return await _api_data_response(cache, request, None)
 
     @app.get("/")
     async def root() -> JSONResponse:
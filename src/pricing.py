@@ -1,4 +1,5 @@
 """The pricing module that manages the interface to Amber and determines when to run based on the best pricing strategy."""
+import bisect
 import datetime as dt
 import operator
 import os
@@ -49,6 +50,7 @@ class PricingManager:
         self.site_id = None
         self.raw_price_data = []   # The raw pricing data retrieved from Amber
         self.today_forecast_data = []       # The processed pricing data
+        self.price_data_version = 0     # Incremented each time the price data is refreshed so consumers can detect changes
 
         self.initialise()
         self.logger.log_message("Pricing manager initialised.", "debug")
@@ -153,6 +155,47 @@ class PricingManager:
 
         return entry["Price"] or 0.0
 
+    def get_prices(self, as_at_times: list[dt.datetime], channel_id: AmberChannel = AmberChannel.GENERAL) -> list[float]:
+        """Fetches the prices for a list of times in one pass, as if get_price() was called for each.
+
+        The channel's price entries are sorted by start time once, and each time is then located with a
+        binary search rather than a linear scan per time. Price entries are assumed not to overlap.
+
+        Args:
+            as_at_times (list[dt.datetime]): The datetimes to get the prices for.
+            channel_id (AmberChannel): The ID of the channel to get the prices for.
+
+        Returns:
+            prices(list[float]): The price in AUD/kWh at each time (in the same order as as_at_times), with 0 where the channel is invalid or no price data is available.
+        """
+        if not as_at_times:
+            return []
+
+        if not self._is_channel_valid(channel_id):
+            self.logger.log_message(f"Invalid channel ID '{channel_id}' specified when checking price data duration.", "error")
+            return [0.0] * len(as_at_times)
+
+        assert isinstance(self.raw_price_data, list)
+        raw_data = next((channel.get("PriceData", []) for channel in self.raw_price_data if channel.get("Name") == channel_id), [])
+        if not raw_data:
+            return [0.0] * len(as_at_times)
+
+        entries = sorted(
+            (e for e in raw_data if isinstance(e.get("StartDateTime"), dt.datetime) and isinstance(e.get("EndDateTime"), dt.datetime)),
+            key=operator.itemgetter("StartDateTime"),
+        )
+        entry_starts = [e["StartDateTime"] for e in entries]
+
+        prices: list[float] = []
+        for as_at_time in as_at_times:
+            # The candidate is the last entry starting at or before as_at_time
+            idx = bisect.bisect_right(entry_starts, as_at_time) - 1
+            if idx >= 0 and as_at_time < entries[idx]["EndDateTime"]:
+                prices.append(entries[idx]["Price"] or 0.0)
+            else:
+                prices.append(0.0)
+        return prices
+
     def get_run_plan(self,
                      required_hours: float,
                      priority_hours: float,
@@ -448,6 +491,7 @@ class PricingManager:
         if not self._get_amber_prices(load_from_file):
             return False
         assert isinstance(self.raw_price_data, list)
+        self.price_data_version += 1
 
         self.logger.log_message("Starting refresh of Amber pricing", "debug")
 
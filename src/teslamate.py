@@ -3,7 +3,8 @@ from __future__ import annotations
 
 import datetime as dt
 import json
-from dataclasses import asdict
+import sys
+from dataclasses import fields
 from typing import TYPE_CHECKING, Any
 
 try:
@@ -19,6 +20,29 @@ if TYPE_CHECKING:
 
     from teslamate_charge_importer.models import TeslaImportResult
 
+# Field names per dataclass type, resolved once and reused by _record_to_dict()
+_FIELD_NAMES_CACHE: dict[type, tuple[str, ...]] = {}
+
+
+def _record_to_dict(record: Any) -> dict[str, Any]:
+    """Convert a flat importer dataclass record into a dict.
+
+    The importer models only hold immutable scalar values (numbers, strings, datetimes), so unlike
+    dataclasses.asdict() there is no need to recurse or deep copy each field.
+
+    Args:
+        record: A ChargingSession or EnergyBucket instance.
+
+    Returns:
+        dict[str, Any]: The record's fields keyed by field name.
+    """
+    cls = type(record)
+    names = _FIELD_NAMES_CACHE.get(cls)
+    if names is None:
+        names = tuple(f.name for f in fields(cls))
+        _FIELD_NAMES_CACHE[cls] = names
+    return {name: getattr(record, name) for name in names}
+
 
 def print_charging_data(config: SCConfigManager, start_date: dt.date) -> None:
     """Print charging sessions and buckets from TeslaMate as JSON lines.
@@ -46,51 +70,59 @@ def print_charging_data(config: SCConfigManager, start_date: dt.date) -> None:
         show_sessions = True
         show_buckets = True
 
+        lines: list[str] = []
+
         if show_sessions:
-            for s in result.sessions:
-                print(
-                    json.dumps(
-                        {
-                            "type": "session",
-                            "id": s.id,
-                            "car_id": s.car_id,
-                            "start_date": s.start_date.isoformat(sep=" "),
-                            "end_date": s.end_date.isoformat(sep=" ") if s.end_date else None,
-                            "duration_min": s.duration_min,
-                            "start_battery_level": s.start_battery_level,
-                            "end_battery_level": s.end_battery_level,
-                            "charge_energy_added_kwh": float(s.charge_energy_added_kwh) if s.charge_energy_added_kwh else None,
-                            "charge_energy_used_kwh": float(s.charge_energy_used_kwh) if s.charge_energy_used_kwh else None,
-                            "cost": float(s.cost) if s.cost else None,
-                            "geofence_name": s.geofence_name,
-                            "short_address": s.short_address,
-                        }
-                    )
+            lines.extend(
+                json.dumps(
+                    {
+                        "type": "session",
+                        "id": s.id,
+                        "car_id": s.car_id,
+                        "start_date": s.start_date.isoformat(sep=" "),
+                        "end_date": s.end_date.isoformat(sep=" ") if s.end_date else None,
+                        "duration_min": s.duration_min,
+                        "start_battery_level": s.start_battery_level,
+                        "end_battery_level": s.end_battery_level,
+                        "charge_energy_added_kwh": float(s.charge_energy_added_kwh) if s.charge_energy_added_kwh else None,
+                        "charge_energy_used_kwh": float(s.charge_energy_used_kwh) if s.charge_energy_used_kwh else None,
+                        "cost": float(s.cost) if s.cost else None,
+                        "geofence_name": s.geofence_name,
+                        "short_address": s.short_address,
+                    }
                 )
+                for s in result.sessions
+            )
 
         if show_buckets:
-            for b in result.buckets:
-                print(
-                    json.dumps(
-                        {
-                            "type": "bucket",
-                            "session_id": b.charging_process_id,
-                            "bucket_start": b.bucket_start.isoformat(sep=" "),
-                            "bucket_end": b.bucket_end.isoformat(sep=" "),
-                            "kwh_added": float(b.kwh_added),
-                            "avg_kw": float(b.avg_kw),
-                        }
-                    )
+            lines.extend(
+                json.dumps(
+                    {
+                        "type": "bucket",
+                        "session_id": b.charging_process_id,
+                        "bucket_start": b.bucket_start.isoformat(sep=" "),
+                        "bucket_end": b.bucket_end.isoformat(sep=" "),
+                        "kwh_added": float(b.kwh_added),
+                        "avg_kw": float(b.avg_kw),
+                    }
                 )
+                for b in result.buckets
+            )
+
+        # Emit everything with a single write rather than one print() per record
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
 
 
-def get_charging_data(config: SCConfigManager, start_date: dt.date, convert_to_local: bool = True) -> TeslaImportResult | None:
+def get_charging_data(config: SCConfigManager, start_date: dt.date, convert_to_local: bool = True, include_address: bool = True) -> TeslaImportResult | None:
     """Return the charging data as a TeslaImportResult object.
 
     Args:
         config: The SCConfigManager instance with TeslaMate config.
         start_date: The date from which to start importing charging data.
         convert_to_local: Whether to convert datetime objects to local timezone strings.
+        include_address: Whether to look up each session's short_address from the TeslaMate addresses table.
 
     Raises:
         ConnectionError: If unable to connect to the TeslaMate database.
@@ -106,20 +138,21 @@ def get_charging_data(config: SCConfigManager, start_date: dt.date, convert_to_l
     db = TeslaMateDb(cfg)
 
     try:
-        result = import_charging_buckets(db, start_date=start_date, geofence_name=cfg.geofence_name, convert_to_local=convert_to_local)
+        result = import_charging_buckets(db, start_date=start_date, geofence_name=cfg.geofence_name, convert_to_local=convert_to_local, include_address=include_address)
     except ConnectionError as e:
         raise ConnectionError(e) from e
     else:
         return result
 
 
-def get_charging_data_as_dict(config: SCConfigManager, start_date: dt.date, convert_to_local: bool = True) -> dict | None:
+def get_charging_data_as_dict(config: SCConfigManager, start_date: dt.date, convert_to_local: bool = True, include_address: bool = True) -> dict | None:
     """Return the charging data as a dict.
 
     Args:
         config: The SCConfigManager instance with TeslaMate config.
         start_date: The date from which to start importing charging data.
         convert_to_local: Whether to convert datetime objects to local timezone strings.
+        include_address: Whether to look up each session's short_address from the TeslaMate addresses table.
 
     Raises:
         ConnectionError: If unable to connect to the TeslaMate database.
@@ -131,7 +164,7 @@ def get_charging_data_as_dict(config: SCConfigManager, start_date: dt.date, conv
         dict | None: The imported charging data, or None if not enabled.
     """
     try:
-        result = get_charging_data(config=config, start_date=start_date, convert_to_local=convert_to_local)
+        result = get_charging_data(config=config, start_date=start_date, convert_to_local=convert_to_local, include_address=include_address)
     except ConnectionError as e:
         raise ConnectionError(e) from e
     else:
@@ -140,14 +173,15 @@ def get_charging_data_as_dict(config: SCConfigManager, start_date: dt.date, conv
 
         return_dict = {
             "start_date": result.start_date.isoformat(),
-            "sessions": [asdict(s) for s in result.sessions],
-            "buckets": [asdict(b) for b in result.buckets],
+            "sessions": [_record_to_dict(s) for s in result.sessions],
+            "buckets": [_record_to_dict(b) for b in result.buckets],
         }
         return return_dict
 
 
 def merge_session_dict_records(existing_sessions: list[dict], new_sessions: list[dict]) -> list[dict]:
     # Merge sessions by session id (replace existing, append new)
+    # The returned list shares the session dicts with the inputs; nothing here mutates them.
 
     existing_list = [x for x in (existing_sessions or []) if isinstance(x, dict)]
     incoming_list = [x for x in (new_sessions or []) if isinstance(x, dict)]
@@ -165,7 +199,7 @@ def merge_session_dict_records(existing_sessions: list[dict], new_sessions: list
     # Seed with existing items (keep order)
     for item in existing_list:
         item_id = _get_id(item)
-        merged.append(dict(item))
+        merged.append(item)
         if item_id is not None and item_id not in id_to_index:
             id_to_index[item_id] = len(merged) - 1
 
@@ -173,14 +207,14 @@ def merge_session_dict_records(existing_sessions: list[dict], new_sessions: list
     for item in incoming_list:
         item_id = _get_id(item)
         if item_id is None:
-            merged.append(dict(item))
+            merged.append(item)
             continue
 
         if item_id in id_to_index:
-            merged[id_to_index[item_id]] = dict(item)
+            merged[id_to_index[item_id]] = item
         else:
             id_to_index[item_id] = len(merged)
-            merged.append(dict(item))
+            merged.append(item)
 
     return merged
 
@@ -188,24 +222,27 @@ def merge_session_dict_records(existing_sessions: list[dict], new_sessions: list
 def merge_bucket_dict_records(existing_buckets: list[dict], new_buckets: list[dict], start_date: dt.date) -> list[dict]:
     # Merge buckets by (session_id, bucket_start) tuple (replace existing, append new)
 
-    pruned_existing_buckets: list[dict[str, Any]] = []
-    for b in existing_buckets:
-        if not isinstance(b, dict):
-            continue
-        bucket_date = b.get("bucket_start").date()  # pyright: ignore[reportOptionalMemberAccess]
-
-        # If we can't determine a date, keep the record rather than risk deleting valid data.
-        if start_date and bucket_date and bucket_date >= start_date:
-            continue
-
-        pruned_existing_buckets.append(b)
+    # Drop existing buckets on/after start_date as they are about to be re-imported. If we can't
+    # determine a bucket's date, keep the record rather than risk deleting valid data.
+    pruned_existing_buckets: list[dict[str, Any]] = [
+        b for b in existing_buckets
+        if isinstance(b, dict)
+        and not (
+            start_date
+            and isinstance(bucket_start := b.get("bucket_start"), dt.datetime)
+            and bucket_start.date() >= start_date
+        )
+    ]
 
     # Merge: remaining existing buckets + all new buckets
     merged_buckets: list[dict[str, Any]] = pruned_existing_buckets + [
         x for x in new_buckets if isinstance(x, dict)
     ]
 
-    def _bucket_sort_key(item: dict[str, Any]) -> tuple[int, str]:
+    def _bucket_sort_key(item: dict[str, Any]) -> tuple[int, int, Any]:
+        # list.sort() evaluates the key once per item, so keep it cheap: compare datetimes natively
+        # and only fall back to string form for anything else. The middle rank element stops tuple
+        # comparison before a datetime is ever compared against a string.
         cpid_val = item.get("charging_process_id")
         try:
             cpid_int = int(cpid_val)  # pyright: ignore[reportArgumentType]
@@ -213,14 +250,11 @@ def merge_bucket_dict_records(existing_buckets: list[dict], new_buckets: list[di
             cpid_int = 2**31 - 1
 
         bucket_start_val = item.get("bucket_start", item.get("BucketStart"))
+        if type(bucket_start_val) is dt.datetime and bucket_start_val.tzinfo is not None:
+            return (cpid_int, 0, bucket_start_val)
         if isinstance(bucket_start_val, (dt.datetime, dt.date)):
-            bucket_start_str = bucket_start_val.isoformat()
-        elif bucket_start_val is None:
-            bucket_start_str = ""
-        else:
-            bucket_start_str = str(bucket_start_val)
-
-        return (cpid_int, bucket_start_str)
+            return (cpid_int, 1, bucket_start_val.isoformat())
+        return (cpid_int, 1, "" if bucket_start_val is None else str(bucket_start_val))
 
     merged_buckets.sort(key=_bucket_sort_key)
     return merged_buckets
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import datetime as dt
+import sys
 from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any
 
 import psycopg
 from psycopg.rows import tuple_row
+from psycopg.types.numeric import FloatLoader
 
 from .models import ChargingSession
 
@@ -14,8 +16,13 @@ if TYPE_CHECKING:
 
     from .config import DbConfig
 
+# Number of rows fetched per round trip when streaming results from a server-side cursor
+STREAM_ITERSIZE = 2000
 
-SESSION_QUERY = """
+
+# {short_address} and {address_join} are filled in below so the addresses join can be skipped
+# when the caller doesn't need the session's street address.
+_SESSION_QUERY_TEMPLATE = """
 SELECT
   cp.id,
   cp.car_id,
@@ -28,10 +35,10 @@ SELECT
   cp.charge_energy_used,
   cp.cost,
   g.name AS geofence_name,
-  concat_ws(', ', a.house_number, a.road, a.neighbourhood, a.state) AS short_address
+  {short_address} AS short_address
 FROM charging_processes cp
 JOIN geofences g ON g.id = cp.geofence_id
-LEFT JOIN addresses a ON cp.address_id = a.id
+{address_join}
 WHERE cp.start_date >= %(start_ts)s
   -- AND cp.end_date IS NOT NULL
     AND (
@@ -41,12 +48,23 @@ WHERE cp.start_date >= %(start_ts)s
 ORDER BY cp.start_date ASC;
 """
 
+SESSION_QUERY = _SESSION_QUERY_TEMPLATE.format(
+    short_address="concat_ws(', ', a.house_number, a.road, a.neighbourhood, a.state)",
+    address_join="LEFT JOIN addresses a ON cp.address_id = a.id",
+)
+
+SESSION_QUERY_NO_ADDRESS = _SESSION_QUERY_TEMPLATE.format(
+    short_address="NULL",
+    address_join="",
+)
+
 
 # Bucketing query:
 # - Filter charges by start_ts (inclusive)
 # - Compute delta kWh via LAG on cumulative charge_energy_added
 # - Clamp negatives to 0
 # - Bucket by floor(minute/5)*5
+# - avg kW over 5 minutes = kWh * 12
 BUCKET_QUERY = """
 -- Params:
 --   %(start_ts)s  = timestamp (e.g. 2025-12-01 00:00:00)
@@ -97,7 +115,8 @@ SELECT
   charging_process_id,
   bucket_start,
   bucket_start + interval '5 minutes' AS bucket_end,
-  kwh_added
+  kwh_added,
+  kwh_added * 12 AS avg_kw
 FROM bucketed
 ORDER BY charging_process_id, bucket_start;
 
@@ -107,27 +126,43 @@ ORDER BY charging_process_id, bucket_start;
 class TeslaMateDb:
     def __init__(self, cfg: DbConfig):
         self.cfg = cfg
+        self._conn: psycopg.Connection | None = None
+        # Resolved once per instance; a TeslaMateDb is created for each import
+        self._tz: dt.tzinfo | None = self._local_tz()
 
     @contextmanager
     def connect(self) -> Iterator[psycopg.Connection]:
-        conn = psycopg.connect(self.cfg.dsn(), row_factory=tuple_row)
+        # Nested connect() blocks share the connection opened by the outermost one, so a caller
+        # can run several queries over a single connection handshake.
+        if self._conn is not None and not self._conn.closed:
+            yield self._conn
+            return
+
+        try:
+            conn = psycopg.connect(self.cfg.dsn(), row_factory=tuple_row)
+        except psycopg.OperationalError as e:
+            error_msg = f"Could not connect to TeslaMate database: {e}"
+            raise ConnectionError(error_msg) from e
+        # Load numeric columns (energy, cost, kWh) straight to float rather than building Decimals
+        conn.adapters.register_loader("numeric", FloatLoader)
+        self._conn = conn
         try:
             yield conn
         finally:
+            self._conn = None
             conn.close()
 
-    @staticmethod
-    def _start_ts_from_date(start_date: dt.date) -> dt.datetime:
+    def _start_ts_from_date(self, start_date: dt.date) -> dt.datetime:
         # TeslaMate stores timestamp without timezone; treat date as local midnight.
-        local_tz = dt.datetime.now().astimezone().tzinfo
         return dt.datetime(
-            start_date.year, start_date.month, start_date.day, 0, 0, 0, tzinfo=local_tz
+            start_date.year, start_date.month, start_date.day, 0, 0, 0, tzinfo=self._tz
         )
 
     def get_sessions_since(self,
                            start_date: dt.date,
                            geofence_name: str | None = None,
-                           convert_to_local: bool = True
+                           convert_to_local: bool = True,
+                           include_address: bool = True
                           ) -> list[ChargingSession]:
         """Get charging sessions since the given date.
 
@@ -135,6 +170,7 @@ class TeslaMateDb:
             start_date: The date from which to start fetching sessions.
             geofence_name: Optional geofence name to filter sessions.
             convert_to_local: Whether to convert datetime objects to local timezone strings.
+            include_address: Whether to look up each session's short_address. If False, short_address is None.
 
         Raises:
             ConnectionError: If unable to connect to the TeslaMate database.
@@ -145,49 +181,47 @@ class TeslaMateDb:
         start_ts = self._start_ts_from_date(start_date)
 
         try:
-            with self.connect() as conn, conn.cursor() as cur:
+            # Use a server-side cursor so rows are streamed rather than materialised in one fetchall()
+            with self.connect() as conn, conn.cursor(name="tm_sessions") as cur:
+                cur.itersize = STREAM_ITERSIZE
                 cur.execute(
-                    SESSION_QUERY,
+                    SESSION_QUERY if include_address else SESSION_QUERY_NO_ADDRESS,
                     {"start_ts": start_ts, "geofence_name": geofence_name},
                 )
-                rows = cur.fetchall()
-        except (ConnectionError, psycopg.OperationalError) as e:
+                to_local = self._convert_dt_to_local
+                local_tz = self._tz
+                sessions: list[ChargingSession] = [
+                    ChargingSession(
+                        id=int(sess_id),
+                        car_id=int(car_id),
+                        start_date=to_local(sess_start, local_tz) if convert_to_local else sess_start,
+                        end_date=to_local(sess_end, local_tz) if convert_to_local and sess_end else sess_end,
+                        duration_min=int(duration) if duration is not None else None,
+                        start_battery_level=int(start_level) if start_level is not None else None,
+                        end_battery_level=int(end_level) if end_level is not None else None,
+                        charge_energy_added_kwh=energy_added,
+                        charge_energy_used_kwh=energy_used,
+                        cost=cost,
+                        # Low-cardinality strings: intern so repeated values share one object
+                        geofence_name=sys.intern(geofence) if geofence is not None else None,
+                        short_address=sys.intern(address) if address is not None else None,
+                    )
+                    for (sess_id, car_id, sess_start, sess_end, duration, start_level, end_level,
+                         energy_added, energy_used, cost, geofence, address) in cur
+                ]
+        except psycopg.OperationalError as e:
+            # connect() raises an already-wrapped ConnectionError, which passes straight through
             error_msg = f"Could not connect to TeslaMate database: {e}"
             raise ConnectionError(error_msg) from e
 
-        sessions: list[ChargingSession] = []
-        for r in rows:
-            sess_start_date = r[2]
-            sess_end_date = r[3]
-            if convert_to_local:
-                sess_start_date = self._convert_dt_to_local(sess_start_date)
-                if sess_end_date:
-                    sess_end_date = self._convert_dt_to_local(sess_end_date)
-
-            sessions.append(
-                ChargingSession(
-                    id=int(r[0]),
-                    car_id=int(r[1]),
-                    start_date=sess_start_date,
-                    end_date=sess_end_date,
-                    duration_min=int(r[4]) if r[4] is not None else None,
-                    start_battery_level=int(r[5]) if r[5] is not None else None,
-                    end_battery_level=int(r[6]) if r[6] is not None else None,
-                    charge_energy_added_kwh=float(r[7]) if r[7] is not None else None,
-                    charge_energy_used_kwh=float(r[8]) if r[8] is not None else None,
-                    cost=r[9] if r[9] is not None else None,
-                    geofence_name=r[10] if r[10] is not None else None,
-                    short_address=r[11] if r[11] is not None else None,
-                )
-            )
         return sessions
 
-    def get_5min_buckets_since(self,
-                               start_date: dt.date,
-                               geofence_name: str | None = None,
-                               convert_to_local: bool = True
-                          ) -> list[tuple[int, dt.datetime, dt.datetime, float]]:
-        """Get 5min charging bucket records since start_date.
+    def iter_5min_buckets_since(self,
+                                start_date: dt.date,
+                                geofence_name: str | None = None,
+                                convert_to_local: bool = True
+                               ) -> Iterator[tuple[int, dt.datetime, dt.datetime, float, float]]:
+        """Yield 5min charging bucket records since start_date as they are streamed from the database.
 
         Args:
             start_date: The date from which to start fetching sessions.
@@ -197,40 +231,39 @@ class TeslaMateDb:
         Raises:
             ConnectionError: If unable to connect to the TeslaMate database.
 
-        Returns:
-            list: List of charging bucket objects.
+        Yields:
+            tuple: (charging_process_id, bucket_start, bucket_end, kwh_added, avg_kw) for each bucket.
         """
         start_ts = self._start_ts_from_date(start_date)
 
         try:
-            with self.connect() as conn, conn.cursor() as cur:
+            # Use a server-side cursor so rows are streamed rather than materialised in one fetchall()
+            with self.connect() as conn, conn.cursor(name="tm_buckets") as cur:
+                cur.itersize = STREAM_ITERSIZE
                 cur.execute(
                     BUCKET_QUERY, {"start_ts": start_ts, "geofence_name": geofence_name}
                 )
-                rows = cur.fetchall()
-        except (ConnectionError, psycopg.OperationalError) as e:
+                local_tz = self._tz
+                for r in cur:
+                    bucket_start = r[1]
+                    bucket_end = r[2]
+                    if convert_to_local:
+                        bucket_start = self._convert_dt_to_local(bucket_start, local_tz)
+                        bucket_end = self._convert_dt_to_local(bucket_end, local_tz)
+
+                    yield (int(r[0]), bucket_start, bucket_end, r[3] or 0.0, r[4] or 0.0)
+        except psycopg.OperationalError as e:
+            # connect() raises an already-wrapped ConnectionError, which passes straight through
             error_msg = f"Could not connect to TeslaMate database: {e}"
             raise ConnectionError(error_msg) from e
 
-        # rows: (charging_process_id, bucket_start, bucket_end, kwh_added)
-        return_rows: list[tuple[int, dt.datetime, dt.datetime, float]] = []
-        for r in rows:
-            charging_process_id = int(r[0])
-            bucket_start = r[1]
-            bucket_end = r[2]
-            if convert_to_local:
-                bucket_start = self._convert_dt_to_local(bucket_start)
-                bucket_end = self._convert_dt_to_local(bucket_end)
-            kwh_added = float(r[3]) or float(0)
-
-            return_rows.append(
-                (charging_process_id, bucket_start, bucket_end, kwh_added)
-            )
-        return return_rows
-
-    def _convert_dt_to_local(self, obj: Any) -> Any:  # noqa: PLR6301
-        local_tz = dt.datetime.now().astimezone().tzinfo
+    @staticmethod
+    def _local_tz() -> dt.tzinfo | None:
+        # Resolve once and pass to _convert_dt_to_local() rather than once per row
+        return dt.datetime.now().astimezone().tzinfo
 
+    @staticmethod
+    def _convert_dt_to_local(obj: Any, local_tz: dt.tzinfo | None) -> Any:
         if isinstance(obj, dt.datetime):
             # Treat naive datetimes as UTC (TeslaMate timestamps are stored without TZ)
             utc_dt = obj if obj.tzinfo is not None else obj.replace(tzinfo=dt.UTC)
@@ -7,7 +7,7 @@ if TYPE_CHECKING:
     from datetime import datetime
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ChargingSession:
     id: int
     car_id: int
@@ -23,7 +23,7 @@ class ChargingSession:
     short_address: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EnergyBucket:
     charging_process_id: int
     bucket_start: datetime
@@ -32,7 +32,7 @@ class EnergyBucket:
     avg_kw: float  # kWh in 5 minutes * 12
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TeslaImportResult:
     start_date: datetime
     sessions: list[ChargingSession]
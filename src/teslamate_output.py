@@ -16,6 +16,8 @@ This output does not participate in run planning or smart device actuation.
 from __future__ import annotations
 
 import datetime as dt
+import functools
+import heapq
 import operator
 import urllib.parse
 from dataclasses import dataclass
@@ -32,26 +34,29 @@ if TYPE_CHECKING:
     from scheduler import Scheduler
 
 
-def _as_local_dt(value: Any) -> dt.datetime | None:
+def _as_local_dt(value: Any, local_tz: dt.tzinfo | None = None) -> dt.datetime | None:
     """Best-effort conversion of persisted values into a local tz-aware datetime.
 
     Args:
         value: A value read from ``TeslaChargeData``.
+        local_tz: The local tzinfo, if the caller has already resolved it (e.g. from ``DateHelper.now()``).
+            Datetimes already at this tzinfo's UTC offset are returned as-is without another timezone conversion.
 
     Returns:
         A tz-aware datetime in local timezone, or None if conversion fails.
     """
     if isinstance(value, dt.datetime):
+        # Compare offsets rather than tzinfo identity: DateHelper.now(), psycopg and the state decoder
+        # each build their own tzinfo objects
+        if local_tz is not None and value.tzinfo is not None and value.utcoffset() == local_tz.utcoffset(value):
+            return value
         return DateHelper.convert_timezone(value)
 
     if isinstance(value, str):
-        # Accept both "2025-12-31T12:34:56" and "2025-12-31 12:34:56".
-        parsed = DateHelper.extract(value, "ISO")
-        if not parsed:
-            parsed = DateHelper.extract(value, "%Y-%m-%d %H:%M:%S")
-        if not parsed:
+        parsed = _parse_dt_str(value)
+        if parsed is None:
             return None
-        assert isinstance(parsed, dt.datetime)
+        # Done outside the cache, as the local offset can change (e.g. at a DST transition)
         if parsed.tzinfo is None:
             parsed = DateHelper.add_timezone(parsed)
         return DateHelper.convert_timezone(parsed)
@@ -59,17 +64,49 @@ def _as_local_dt(value: Any) -> dt.datetime | None:
     return None
 
 
-def calc_energy_cost(kwh_used: float, price: float) -> float:
-    """Calculate the cost in $ given energy used in Wh and price in c/kWh.
+@functools.lru_cache(maxsize=1024)
+def _parse_dt_str(value: str) -> dt.datetime | None:
+    """Parse a persisted timestamp string, without any timezone conversion.
+
+    The same bucket timestamps are parsed again on every rebuild, so results are cached.
+
+    Args:
+        value: A timestamp string read from ``TeslaChargeData``.
+
+    Returns:
+        The parsed datetime (naive if the string has no offset), or None if parsing fails.
+    """
+    # fromisoformat() handles both "2025-12-31T12:34:56" and "2025-12-31 12:34:56", with or without an offset
+    try:
+        parsed = dt.datetime.fromisoformat(value)
+    except ValueError:
+        parsed = DateHelper.extract(value, "ISO")
+        if not parsed:
+            parsed = DateHelper.extract(value, "%Y-%m-%d %H:%M:%S")
+        if not parsed:
+            return None
+    assert isinstance(parsed, dt.datetime)
+    return parsed
+
+
+def _timestamp_sort_key(value: Any) -> tuple[int, Any]:
+    """Sort key for a persisted timestamp value.
+
+    Aware datetimes are compared natively instead of via a new string per element. Missing values
+    sort first and anything else falls back to its string form. The leading rank keeps datetimes and
+    strings from ever being compared with each other.
 
     Args:
-        kwh_used (float): The energy used in kWh.
-        price (float): The price in c/kWh.
+        value: A timestamp value read from ``TeslaChargeData``.
 
     Returns:
-        float: Total cost in $.
+        A (rank, value) tuple suitable for use as a sort key.
     """
-    return kwh_used * (price / 100) if kwh_used > 0 else 0
+    if not value:
+        return (0, "")
+    if isinstance(value, dt.datetime) and value.tzinfo is not None:
+        return (1, value)
+    return (2, str(value))
 
 
 @dataclass
@@ -146,8 +183,13 @@ class TeslaMateOutput:
         self.run_history: dict[str, Any] = saved_history if isinstance(saved_history, dict) else {}
         if not self.run_history:
             self.run_history = self._create_empty_history()
+        self._day_index: dict[dt.date, dict[str, Any]] = self._index_daily_data(self.run_history.get("DailyData"))
 
         self._last_rebuild: dt.datetime | None = None
+        self._rebuild_signature: tuple | None = None    # Inputs used by the last full rebuild, see _get_rebuild_signature()
+        self._rebuild_has_in_progress: bool = False     # True if the last rebuild included an in-progress charging run
+        self._webapp_cache: tuple[tuple | None, dict[str, Any]] = (None, {})  # Last get_webapp_data() payload and the key it was built for
+        self._filter_cache: dict[str, tuple[tuple, Any]] = {}  # Last _filtered_sessions/_filtered_buckets/_session_id_sets/_charge_data_state results, see _filter_cache_key()
         self.initialise(output_config, None, saved_state)
         self.logger.log_message(f"Output {self.name} initialised.", "debug")
 
@@ -177,6 +219,9 @@ class TeslaMateOutput:
             raise RuntimeError(msg)
 
         self.output_config = output_config
+        self._rebuild_signature = None  # Config may have changed, so force a full rebuild
+        self._filter_cache.clear()
+        self._webapp_cache = (None, {})
 
         try:
             # Name
@@ -355,19 +400,26 @@ class TeslaMateOutput:
             view: Unused for TeslaMate outputs.
 
         Returns:
-            Snapshot dict in the same shape as other outputs (best-effort).
+            Snapshot dict in the same shape as other outputs (best-effort). The payload is cached, so each
+            call returns a new copy; its values are all immutable, so a shallow copy is enough.
         """
         if self.output_config.get("HideFromWebApp", False):
             return {}
 
         is_on, reason = self._current_state_from_charge_data()
         today = DateHelper.today()
+
+        # The formatted payload only changes when the history, charge data or charging state does
+        cache_key = (self._filter_cache_key(), self.run_history.get("LastUpdate"), today, is_on, reason, self.app_mode)
+        if self._webapp_cache[0] == cache_key:
+            return dict(self._webapp_cache[1])
+
         today_obj = self._get_day(today)
         energy_wh = float(today_obj.get("EnergyUsed") or 0) if today_obj else 0.0
         total_cost = float(today_obj.get("TotalCost") or 0.0) if today_obj else 0.0
         actual_hours = float(today_obj.get("ActualHours") or 0.0) if today_obj else 0.0
 
-        return {
+        webapp_data = {
             "id": self.id,
             "allow_actions": False,
             "name": self.name,
@@ -394,6 +446,8 @@ class TeslaMateOutput:
             "power_draw": self._current_power_draw_text(),
             "current_price": "N/A",
         }
+        self._webapp_cache = (cache_key, webapp_data)
+        return dict(webapp_data)
 
     def _get_price(self, as_at_time: dt.datetime | None = None) -> float:
         """Get the current energy price based on the output's pricing configuration.
@@ -456,47 +510,94 @@ class TeslaMateOutput:
         if not buckets:
             return "None"
         last = buckets[-1]
-        avg_kw = last.get("avg_kw")
-        if not isinstance(avg_kw, (int, float, str)):
-            return "None"
         try:
-            watts = float(avg_kw) * 1000.0
+            watts = float(last.get("avg_kw")) * 1000.0  # pyright: ignore[reportArgumentType]
         except (TypeError, ValueError):
             return "None"
         return f"{watts:.0f}W" if watts > 0 else "None"
 
     def _current_state_from_charge_data(self) -> tuple[bool, str]:
         now = DateHelper.now()
+
+        # Everything except the "recent bucket" test only depends on the charge data, so reuse it
+        # until the next import. This keeps the per-tick get_save_object() / get_webapp_data() calls cheap.
+        cache_key = self._filter_cache_key()
+        cached = self._filter_cache.get("state")
+        if cached is not None and cached[0] == cache_key:
+            fixed_state, last_end = cached[1]
+        else:
+            fixed_state, last_end = self._charge_data_state(now.tzinfo)
+            self._filter_cache["state"] = (cache_key, (fixed_state, last_end))
+
+        if fixed_state is not None:
+            return fixed_state
+        if last_end and (now - last_end) <= dt.timedelta(minutes=20):
+            return True, "Charging"
+        return False, "Not charging"
+
+    def _charge_data_state(self, local_tz: dt.tzinfo | None) -> tuple[tuple[bool, str] | None, dt.datetime | None]:
+        """Work out the parts of the current charging state that only depend on the charge data.
+
+        Args:
+            local_tz: The local timezone.
+
+        Returns:
+            tuple: Either a fixed (is_on, reason) state and None, or None and the end of the latest
+                bucket of an in-progress session (which may also be None).
+        """
         sessions = self._filtered_sessions()
         if not sessions:
-            return False, "No TeslaMate data"
+            return (False, "No TeslaMate data"), None
 
         # Consider charging "on" if there is any in-progress session with recent buckets.
-        in_progress_ids: set[int] = set()
-        for s in sessions:
-            end_dt = _as_local_dt(s.get("end_date"))
-            if end_dt is None:
-                sid = s.get("id")
-                if isinstance(sid, int):
-                    in_progress_ids.add(sid)
-
+        _, in_progress_ids = self._session_id_sets()
         if not in_progress_ids:
-            return False, "Not charging"
+            return (False, "Not charging"), None
 
         buckets = self._filtered_buckets(session_ids=in_progress_ids)
         if not buckets:
-            return True, "Charging (no bucket data yet)"
+            return (True, "Charging (no bucket data yet)"), None
 
-        last_end = _as_local_dt(buckets[-1].get("bucket_end"))
-        if last_end and (now - last_end) <= dt.timedelta(minutes=20):
-            return True, "Charging"
-        return False, "Not charging"
+        return None, _as_local_dt(buckets[-1].get("bucket_end"), local_tz)
+
+    def _filter_cache_key(self, *extra: Any) -> tuple:
+        """Return a key identifying the raw TeslaChargeData lists and filter settings.
+
+        The controller swaps in new sessions/buckets lists (and updates last_import) on every import,
+        so a filtered result can be reused for as long as this key is unchanged. Callers must treat the
+        cached lists as read-only.
+
+        Args:
+            *extra: Any additional values that the filtered result depends on.
+
+        Returns:
+            tuple: The cache key.
+        """
+        # The controller always replaces the sessions and buckets lists and never changes them in place
+        # (see PowerController and merge_*_dict_records() in teslamate.py). last_import is updated on every
+        # import, so it guards against a freed list's id() being reused for the next one.
+        raw_sessions = self._tesla_charge_data.get("sessions")
+        raw_buckets = self._tesla_charge_data.get("buckets")
+        return (
+            self._tesla_charge_data.get("last_import"),
+            id(raw_sessions),
+            len(raw_sessions) if isinstance(raw_sessions, list) else -1,
+            id(raw_buckets),
+            len(raw_buckets) if isinstance(raw_buckets, list) else -1,
+            self.car_id,
+            *extra,
+        )
 
     def _filtered_sessions(self) -> list[dict[str, Any]]:
         sessions = self._tesla_charge_data.get("sessions")
         if not isinstance(sessions, list):
             return []
 
+        cache_key = self._filter_cache_key()
+        cached = self._filter_cache.get("sessions")
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
         out: list[dict[str, Any]] = []
         for s in sessions:
             if not isinstance(s, dict):
@@ -505,17 +606,50 @@ class TeslaMateOutput:
                 continue
             out.append(s)
 
-        out.sort(key=lambda x: str(x.get("start_date") or ""))
+        out.sort(key=lambda x: _timestamp_sort_key(x.get("start_date")))
+        self._filter_cache["sessions"] = (cache_key, out)
         return out
 
-    def _filtered_buckets(self, session_ids: set[int] | None = None) -> list[dict[str, Any]]:
+    def _session_id_sets(self) -> tuple[frozenset[int], frozenset[int]]:
+        """Return the ids of all the filtered sessions, and of those that are still in progress.
+
+        Returns:
+            tuple: (all session ids, in-progress session ids). Cached until the TeslaChargeData changes.
+        """
+        cache_key = self._filter_cache_key()
+        cached = self._filter_cache.get("session_ids")
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
+        local_tz = DateHelper.now().tzinfo
+        all_ids: set[int] = set()
+        in_progress_ids: set[int] = set()
+        for s in self._filtered_sessions():
+            sid = s.get("id")
+            if not isinstance(sid, int):
+                continue
+            all_ids.add(sid)
+            if _as_local_dt(s.get("end_date"), local_tz) is None:
+                in_progress_ids.add(sid)
+
+        result = (frozenset(all_ids), frozenset(in_progress_ids))
+        self._filter_cache["session_ids"] = (cache_key, result)
+        return result
+
+    def _filtered_buckets(self, session_ids: frozenset[int] | None = None) -> list[dict[str, Any]]:
         buckets = self._tesla_charge_data.get("buckets")
         if not isinstance(buckets, list):
             return []
 
+        cache_key = self._filter_cache_key(session_ids)
+        cache_slot = "buckets" if session_ids is None else "buckets_by_session"
+        cached = self._filter_cache.get(cache_slot)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
         allowed_session_ids = session_ids
         if allowed_session_ids is None and self.car_id is not None:
-            allowed_session_ids = {s.get("id") for s in self._filtered_sessions() if isinstance(s.get("id"), int)}
+            allowed_session_ids, _ = self._session_id_sets()
 
         out: list[dict[str, Any]] = []
         for b in buckets:
@@ -526,17 +660,19 @@ class TeslaMateOutput:
                 continue
             out.append(b)
 
-        out.sort(key=lambda x: str(x.get("bucket_start") or ""))
+        out.sort(key=lambda x: _timestamp_sort_key(x.get("bucket_start")))
+        self._filter_cache[cache_slot] = (cache_key, out)
         return out
 
     def _get_day(self, day: dt.date) -> dict[str, Any] | None:
-        daily = self.run_history.get("DailyData")
+        return self._day_index.get(day)
+
+    @staticmethod
+    def _index_daily_data(daily: Any) -> dict[dt.date, dict[str, Any]]:
+        """Index the DailyData day objects by date. The values alias the entries in the list."""
         if not isinstance(daily, list):
-            return None
-        for d in daily:
-            if isinstance(d, dict) and d.get("Date") == day:
-                return d
-        return None
+            return {}
+        return {d["Date"]: d for d in daily if isinstance(d, dict) and "Date" in d}
 
     @staticmethod
     def _create_empty_history() -> dict[str, Any]:
@@ -580,28 +716,57 @@ class TeslaMateOutput:
         if self._last_rebuild and (now - self._last_rebuild) < dt.timedelta(seconds=1):
             return
 
-        sessions = self._filtered_sessions()
-        buckets = self._filtered_buckets()
-
-        session_by_id = self._index_sessions_by_id(sessions)
-        per_day_session = self._aggregate_buckets(buckets)
-        daily_list = self._build_daily_data(per_day_session, session_by_id)
-        daily_list = self._apply_history_limit(daily_list)
-        self._finalize_daily_totals(daily_list)
-        current_totals = self._compute_current_totals(daily_list)
-        most_recent_end: dt.datetime | None = None
-        for b in buckets:
-            end_dt = _as_local_dt(b.get("bucket_end"))
-            if end_dt is None:
-                continue
-            if most_recent_end is None or end_dt > most_recent_end:
-                most_recent_end = end_dt
+        # Skip the rebuild if none of its inputs have changed. In-progress runs depend on the current
+        # time, so while one exists we always rebuild.
+        signature = self._get_rebuild_signature(now)
+        if not self._rebuild_has_in_progress and signature == self._rebuild_signature:
+            self._last_rebuild = now
+            return
 
+        buckets = self._filtered_buckets()
+        if buckets:
+            session_by_id = self._index_sessions_by_id(self._filtered_sessions())
+            per_day_session, most_recent_end = self._aggregate_buckets(buckets)
+            daily_list = self._build_daily_data(per_day_session, session_by_id)
+        else:
+            # No bucket data yet (or CarID filters it all out), so skip straight to an empty history
+            most_recent_end = None
+            daily_list = []
+        current_totals = self._finalize_daily_totals(daily_list)
         self.last_changed = most_recent_end or now
         self._save_history(daily_list, current_totals, now)
 
+        self._rebuild_has_in_progress = any(
+            run.get("EndTime") is None for day_obj in daily_list for run in day_obj["DeviceRuns"]
+        )
+        self._rebuild_signature = signature
         self._last_rebuild = now
 
+    def _get_rebuild_signature(self, now: dt.datetime) -> tuple:
+        """Return a tuple identifying the inputs to _rebuild_history_from_charge_data().
+
+        The controller replaces the sessions and buckets lists (and updates last_import) on every
+        TeslaMate import, and the PricingManager bumps price_data_version on every price refresh,
+        so an unchanged signature means a rebuild would produce the same history.
+
+        Args:
+            now: The current time.
+
+        Returns:
+            tuple: The rebuild signature.
+        """
+        raw_sessions = self._tesla_charge_data.get("sessions")
+        raw_buckets = self._tesla_charge_data.get("buckets")
+        return (
+            self._tesla_charge_data.get("last_import"),
+            id(raw_sessions),
+            len(raw_sessions) if isinstance(raw_sessions, list) else -1,
+            id(raw_buckets),
+            len(raw_buckets) if isinstance(raw_buckets, list) else -1,
+            now.date(),
+            self.pricing.price_data_version,
+        )
+
     @staticmethod
     def _index_sessions_by_id(sessions: list[dict[str, Any]]) -> dict[int, dict[str, Any]]:
         session_by_id: dict[int, dict[str, Any]] = {}
@@ -611,7 +776,7 @@ class TeslaMateOutput:
                 session_by_id[sid] = s
         return session_by_id
 
-    def _aggregate_buckets(self, buckets: list[dict[str, Any]]) -> dict[tuple[dt.date, int], dict[str, Any]]:
+    def _aggregate_buckets(self, buckets: list[dict[str, Any]]) -> tuple[dict[tuple[dt.date, int], dict[str, Any]], dt.datetime | None]:
         """
         Aggregate bucket records into per-day, per-session summaries.
 
@@ -619,49 +784,70 @@ class TeslaMateOutput:
             buckets: List of bucket dicts from TeslaMate data.
 
         Returns:
-            A dict mapping (date, session_id) to aggregated data including
-            start time, end time, and total kWh added.
+            A tuple of a dict mapping (date, session_id) to aggregated data including
+            start time, end time, and total kWh added, and the latest bucket end time (or None).
         """
-        per_day_session: dict[tuple[dt.date, int], dict[str, Any]] = {}
+        per_ordinal_session: dict[tuple[int, int], dict[str, Any]] = {}
+        most_recent_end: dt.datetime | None = None
+        local_tz = DateHelper.now().tzinfo
+
+        # First pass: parse the usable buckets so that prices can be looked up in one bulk call
+        parsed: list[tuple[int, dt.datetime, dt.datetime, float]] = []
         for b in buckets:
+            # The latest end time covers every bucket with a valid end, even ones that can't be aggregated
+            end_dt = _as_local_dt(b.get("bucket_end"), local_tz)
+            if end_dt is not None and (most_recent_end is None or end_dt > most_recent_end):
+                most_recent_end = end_dt
+
             sid = b.get("charging_process_id")
             if not isinstance(sid, int):
                 continue
 
-            start_dt = _as_local_dt(b.get("bucket_start"))
-            end_dt = _as_local_dt(b.get("bucket_end"))
+            start_dt = _as_local_dt(b.get("bucket_start"), local_tz)
             if start_dt is None or end_dt is None:
                 continue
 
-            kwh_raw = b.get("kwh_added")
-            if not isinstance(kwh_raw, (int, float, str)):
-                continue
+            # A missing value raises TypeError
             try:
-                kwh = float(kwh_raw)
+                kwh = float(b.get("kwh_added"))  # pyright: ignore[reportArgumentType]
             except (TypeError, ValueError):
                 continue
 
-            # Call the PricingManager.get_price(...) method for the start_dt time.
-            price = self.pricing.get_price(as_at_time=start_dt, channel_id=self.amber_channel)
+            parsed.append((sid, start_dt, end_dt, kwh))
+
+        # Get the PricingManager price for each bucket's start time
+        prices = self.pricing.get_prices([p[1] for p in parsed], channel_id=self.amber_channel)
 
-            day = start_dt.date()
-            key = (day, sid)
-            entry = per_day_session.get(key)
+        for (sid, start_dt, end_dt, kwh), price in zip(parsed, prices, strict=True):
+            # Cost in $ from kWh and a c/kWh price
+            cost = kwh * price * 0.01 if kwh > 0 else 0.0
+            # Key on the local day ordinal rather than allocating a date object per bucket
+            key = (start_dt.toordinal(), sid)
+            entry = per_ordinal_session.get(key)
             if entry is None:
-                per_day_session[key] = {
+                per_ordinal_session[key] = {
                     "start": start_dt,
                     "end": end_dt,
                     "kwh": kwh,
-                    "cost": calc_energy_cost(kwh, price),
+                    "cost": cost,
                 }
                 continue
 
             entry["start"] = min(entry["start"], start_dt)
             entry["end"] = max(entry["end"], end_dt)
             entry["kwh"] += kwh
-            entry["cost"] += calc_energy_cost(kwh, price)
+            entry["cost"] += cost
 
-        return per_day_session
+        # Materialise each distinct day once
+        days: dict[int, dt.date] = {}
+        per_day_session: dict[tuple[dt.date, int], dict[str, Any]] = {}
+        for (day_ordinal, sid), entry in per_ordinal_session.items():
+            day = days.get(day_ordinal)
+            if day is None:
+                day = days[day_ordinal] = dt.date.fromordinal(day_ordinal)
+            per_day_session[(day, sid)] = entry
+
+        return per_day_session, most_recent_end
 
     @staticmethod
     def _new_day_object(day: dt.date) -> dict[str, Any]:
@@ -689,19 +875,26 @@ class TeslaMateOutput:
             session_by_id: Indexed session data by session ID.
 
         Returns:
-            A list of daily data dicts.
+            A list of daily data dicts, limited to the most recent DaysOfHistory days.
         """
         now = DateHelper.now()
         today = now.date()
 
-        in_progress_session_ids: set[int] = {
-            sid
-            for sid, sess in session_by_id.items()
-            if isinstance(sess, dict) and _as_local_dt(sess.get("end_date")) is None
-        }
+        # Apply the history limit up front so that runs are only built for the days we keep
+        kept_days: set[dt.date] | None = None
+        max_days = self.get_days_of_history()
+        if max_days > 0:
+            all_days = {day for day, _ in per_day_session}
+            if len(all_days) > max_days:
+                kept_days = set(heapq.nlargest(max_days, all_days))
+
+        _, in_progress_session_ids = self._session_id_sets()
+        in_progress_cutoff = now - dt.timedelta(minutes=20)
 
         daily_map: dict[dt.date, dict[str, Any]] = {}
         for (day, sid), agg in per_day_session.items():
+            if kept_days is not None and day not in kept_days:
+                continue
             day_obj = daily_map.get(day)
             if day_obj is None:
                 day_obj = self._new_day_object(day)
@@ -715,7 +908,7 @@ class TeslaMateOutput:
             # - DeviceRun EndTime and ReasonStopped should be null.
             is_in_progress = False
             # Consider "currently charging" if the most recent bucket end is recent.
-            if sid in in_progress_session_ids and day == today and (now - end_dt) <= dt.timedelta(minutes=20):
+            if sid in in_progress_session_ids and day == today and end_dt >= in_progress_cutoff:
                 is_in_progress = True
 
             end_for_totals = now if is_in_progress else end_dt
@@ -747,26 +940,27 @@ class TeslaMateOutput:
 
         return sorted(daily_map.values(), key=operator.itemgetter("Date"))
 
-    def _apply_history_limit(self, daily_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        max_days = self.get_days_of_history()
-        if max_days > 0 and len(daily_list) > max_days:
-            return daily_list[-max_days:]
-        return daily_list
-
     @staticmethod
-    def _finalize_daily_totals(daily_list: list[dict[str, Any]]) -> None:
-        for day_obj in daily_list:
-            total_hours = 0.0
-            total_wh = 0
-            total_cost = 0.0
+    def _finalize_daily_totals(daily_list: list[dict[str, Any]]) -> dict[str, Any]:
+        """Fill in each day's totals from its DeviceRuns and return the totals across all days.
 
-            runs = day_obj.get("DeviceRuns")
-            if not isinstance(runs, list):
-                continue
-            for run in runs:
-                total_hours += float(run.get("ActualHours") or 0.0)
-                total_wh += int(run.get("EnergyUsed") or 0)
-                total_cost += float(run.get("TotalCost") or 0.0)
+        The DeviceRuns are built by _build_daily_data() with typed ActualHours, EnergyUsed and TotalCost
+        values, so no coercion is needed here.
+
+        Args:
+            daily_list: The daily data list to update in place.
+
+        Returns:
+            The CurrentTotals dict for the history.
+        """
+        all_hours = 0.0
+        all_wh = 0
+        all_cost = 0.0
+        for day_obj in daily_list:
+            runs = day_obj["DeviceRuns"]
+            total_hours = sum((run["ActualHours"] for run in runs), 0.0)
+            total_wh = sum(run["EnergyUsed"] for run in runs)
+            total_cost = sum((run["TotalCost"] for run in runs), 0.0)
 
             day_obj["ActualHours"] = total_hours
             day_obj["EnergyUsed"] = total_wh
@@ -774,32 +968,24 @@ class TeslaMateOutput:
             day_obj["HourlyEnergyUsed"] = (total_wh / total_hours) if total_hours > 0 else 0.0
             day_obj["AveragePrice"] = (total_cost / (total_wh / 1000.0)) * 100.0 if total_wh > 0 else 0.0
 
-    @staticmethod
-    def _compute_current_totals(daily_list: list[dict[str, Any]]) -> dict[str, Any]:
-        current_totals: dict[str, Any] = {
-            "EnergyUsed": 0,
-            "HourlyEnergyUsed": 0.0,
-            "TotalCost": 0.0,
-            "AveragePrice": 0.0,
-            "ActualHours": 0.0,
-            "ActualDays": 0,
-            "ActualHoursPerDay": 0.0,
+            all_hours += total_hours
+            all_wh += total_wh
+            all_cost += total_cost
+
+        days = len(daily_list)
+        return {
+            "EnergyUsed": all_wh,
+            "HourlyEnergyUsed": (all_wh / (days * 24)) if days > 0 else 0.0,
+            "TotalCost": all_cost,
+            "AveragePrice": (all_cost / (all_wh / 1000.0)) * 100.0 if all_wh > 0 else 0.0,
+            "ActualHours": all_hours,
+            "ActualDays": days,
+            "ActualHoursPerDay": (all_hours / days) if days > 0 else 0.0,
         }
-        for d in daily_list:
-            current_totals["EnergyUsed"] += int(d.get("EnergyUsed") or 0)
-            current_totals["TotalCost"] += float(d.get("TotalCost") or 0.0)
-            current_totals["ActualHours"] += float(d.get("ActualHours") or 0.0)
-            current_totals["ActualDays"] += 1
-
-        days = int(current_totals["ActualDays"])
-        current_totals["HourlyEnergyUsed"] = (current_totals["EnergyUsed"] / (days * 24)) if days > 0 else 0.0
-        if current_totals["EnergyUsed"] > 0:
-            current_totals["AveragePrice"] = (current_totals["TotalCost"] / (current_totals["EnergyUsed"] / 1000.0)) * 100.0
-        current_totals["ActualHoursPerDay"] = (current_totals["ActualHours"] / days) if days > 0 else 0.0
-        return current_totals
 
     def _save_history(self, daily_list: list[dict[str, Any]], current_totals: dict[str, Any], now: dt.datetime) -> None:
         self.run_history["DailyData"] = daily_list
+        self._day_index = self._index_daily_data(daily_list)
         self.run_history["HistoryDays"] = len(daily_list)
         self.run_history["CurrentTotals"] = current_totals
         self.run_history["AlltimeTotals"] = dict(current_totals)
@@ -1,8 +1,15 @@
-"""UPS Integration module for monitoring UPS status via shell scripts."""
+"""UPS Integration module for monitoring UPS status via shell scripts or a NUT daemon."""
 
+import csv
 import datetime as dt
 import json
+import os
+import re
+import socket
 import subprocess  # noqa: S404
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -10,6 +17,117 @@ from sc_foundation import CSVReader, DateHelper, SCCommon, SCConfigManager, SCLo
 
 from config_schemas import ConfigSchema
 
+CSV_TRIM_INTERVAL = 3600  # Seconds between re-reading and trimming the UPS data file
+
+# The fields returned by get_ups_results() for each UPS
+UPS_RESULT_KEYS = ("timestamp", "battery_charge_percent", "battery_runtime_seconds", "battery_state", "is_healthy")
+
+# Most UPS scripts run at once; further scripts queue in the pool until a worker is free
+MAX_POLL_WORKERS = min(8, os.cpu_count() or 4)
+
+NUT_DEFAULT_PORT = 3493
+NUT_TIMEOUT = 10  # Seconds to wait for the NUT daemon to connect or reply
+NUT_ESCAPE = re.compile(r"\\(.)")  # NUT backslash-escapes quotes and backslashes inside quoted values
+
+
+@dataclass(slots=True)
+class _DataFileState:
+    """Settings and write state for the UPS data CSV file."""
+
+    enabled: bool = False
+    file_name: str | None = None
+    write_interval: int = 60
+    last_write_monotonic: float | None = None  # time.monotonic() of the last write
+    keep_max_days: int = 3
+
+
+class _NUTClient:
+    """Minimal client for the Network UPS Tools daemon (upsd) that keeps its connection open between polls."""
+
+    def __init__(self, device: str):
+        """Initialise the client. No connection is made until the first read.
+
+        Args:
+            device (str): The UPS in upsc format, e.g. "apc@localhost" or "apc@192.168.1.5:3493".
+
+        Raises:
+            ValueError: If the device string is not valid.
+        """
+        ups_name, _, host = device.partition("@")
+        host, _, port = host.partition(":")
+        if not ups_name:
+            msg = f"Invalid NUT device '{device}'"
+            raise ValueError(msg)
+        self.ups_name = ups_name
+        self.address = (host or "localhost", int(port) if port else NUT_DEFAULT_PORT)
+        self._sock: socket.socket | None = None
+        self._reader = None
+
+    def close(self) -> None:
+        """Close the connection to the daemon, if open."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def get_vars(self, names: tuple[str, ...]) -> dict[str, str | None]:
+        """Read a set of variables for the UPS, reconnecting if the connection has dropped.
+
+        Args:
+            names (tuple[str, ...]): The NUT variable names, e.g. "battery.charge".
+
+        Returns:
+            dict[str, str | None]: The values keyed by name, or None where the UPS does not support the variable.
+
+        Raises:
+            OSError: If the daemon can't be reached or returns an error. The connection is closed so the next call reconnects.
+        """
+        try:
+            return {name: self._get_var(name) for name in names}
+        except OSError:
+            self.close()
+            raise
+        except UnicodeDecodeError as e:
+            # The rest of the stream can't be trusted after a bad reply, so treat it like a dropped connection
+            self.close()
+            msg = f"Invalid reply from NUT daemon: {e}"
+            raise ConnectionError(msg) from e
+
+    def _get_var(self, name: str) -> str | None:
+        """Send one GET VAR request and parse the reply, connecting first if needed.
+
+        Args:
+            name (str): The NUT variable name.
+
+        Returns:
+            str | None: The value, or None if the UPS does not support the variable.
+
+        Raises:
+            OSError: If the connection fails or the daemon returns an error.
+        """
+        if self._sock is None:
+            self._sock = socket.create_connection(self.address, timeout=NUT_TIMEOUT)
+            self._reader = self._sock.makefile("r", encoding="utf-8", newline="\n")
+        self._sock.sendall(f"GET VAR {self.ups_name} {name}\n".encode())
+        line = self._reader.readline().rstrip("\n")  # pyright: ignore[reportOptionalMemberAccess]
+        if not line:
+            msg = "Connection closed by NUT daemon"
+            raise ConnectionError(msg)
+
+        # Reply is either VAR <ups> <name> "<value>" or ERR <reason>
+        prefix = f"VAR {self.ups_name} {name} "
+        if line.startswith(prefix):
+            value = line[len(prefix):]
+            if len(value) > 1 and value[0] == value[-1] == '"':
+                value = NUT_ESCAPE.sub(r"\1", value[1:-1])
+            return value
+        if line == "ERR VAR-NOT-SUPPORTED":
+            return None
+        msg = f"NUT daemon returned '{line}' for {name}"
+        raise ConnectionError(msg)
+
 
 class UPSIntegration:
     """Manages UPS monitoring and health status."""
@@ -26,15 +144,14 @@ class UPSIntegration:
         self.enabled: bool = False
         self.polling_interval: int = 60  # Default to 60 seconds if not specified in config
         self.time_last_polled: dt.datetime | None = None
-        self.data_file: dict = {
-            "enabled": False,
-            "file_name": None,
-            "write_interval": 0,
-            "last_write_time": None,
-            "keep_max_hours": 0,
-        }
+        self._last_poll_monotonic: float | None = None  # time.monotonic() of the last poll, used for the polling interval
+        self.data_file = _DataFileState()
 
         self.ups_list: list[dict[str, Any]] = []
+        self._ups_by_name: dict[str, dict[str, Any]] = {}  # The ups_list entries keyed by name
+        self._csv_reader: CSVReader | None = None
+        self._csv_last_trim_monotonic: float | None = None
+        self._pool: ThreadPoolExecutor | None = None  # Used to run the UPS scripts in parallel when there is more than one
 
         # Initialize from config
         self.initialise()
@@ -45,32 +162,50 @@ class UPSIntegration:
         Creates a list of UPS dict objects with configuration and current status.
         """
         ups_config = self.config.get("UPSIntegration", default=[])
+        self._close_nut_clients()
         if not ups_config or not ups_config.get("Enable", True):
             self.ups_list = []
+            self._ups_by_name = {}
+            self._reset_pool()
             return
 
         # Get the information from the config, with defaults if not specified
         self.polling_interval = ups_config.get("PollingInterval", 60) or 60
-        self.data_file["file_name"] = ups_config.get("DataFile", None)
-        self.data_file["write_interval"] = ups_config.get("DataFileWriteInterval", 60) or 60
-        self.data_file["keep_max_days"] = ups_config.get("DataFileMaxDays", 3) or 3
-        if self.data_file["file_name"]:
-            self.data_file["enabled"] = True
+        self.data_file.file_name = ups_config.get("DataFile", None)
+        self.data_file.write_interval = ups_config.get("DataFileWriteInterval", 60) or 60
+        self.data_file.keep_max_days = ups_config.get("DataFileMaxDays", 3) or 3
+        self.data_file.enabled = bool(self.data_file.file_name)
+
+        # Force a full read of the (possibly different) data file on the next write
+        self._csv_reader = None
+        self._csv_last_trim_monotonic = None
         self.enabled = True
 
         # Now read the UPS device configurations
         self.ups_list = []
+        project_root = SCCommon.get_project_root()
         for ups_device in ups_config.get("UPSDevices", []):
             name = ups_device.get("Name")
             script = ups_device.get("Script")
+            nut_device = ups_device.get("NUTDevice")
 
-            if not name or not script:
-                self.logger.log_message("UPS configuration missing Name or Script", "error")
+            if not name or not (script or nut_device):
+                self.logger.log_message("UPS configuration missing Name, or both Script and NUTDevice", "error")
                 continue
 
+            nut_client = None
+            if nut_device:
+                try:
+                    nut_client = _NUTClient(nut_device)
+                except ValueError as e:
+                    self.logger.log_message(f"UPS '{name}': {e}", "error")
+                    continue
+
             ups_entry = {
                 "name": name,
                 "script": script,
+                "command": self._resolve_script_command(script, project_root) if script else None,
+                "nut": nut_client,
                 "min_runtime_when_charging": ups_device.get("MinRuntimeWhenCharging", 0),
                 "min_charge_when_charging": ups_device.get("MinChargeWhenCharging", 0),
                 "min_runtime_when_discharging": ups_device.get("MinRuntimeWhenDischarging", 0),
@@ -80,9 +215,17 @@ class UPSIntegration:
                 "battery_runtime_seconds": None,
                 "battery_state": None,
                 "is_healthy": True,  # Default to healthy until proven otherwise
+                "last_reading_key": None,  # (charge, runtime, state) of the last reading assessed
+            }
+            # (min charge, min runtime) for each battery state that has thresholds
+            ups_entry["thresholds"] = {
+                "charging": (ups_entry["min_charge_when_charging"] or 0, ups_entry["min_runtime_when_charging"] or 0),
+                "discharging": (ups_entry["min_charge_when_discharging"] or 0, ups_entry["min_runtime_when_discharging"] or 0),
             }
             self.ups_list.append(ups_entry)
 
+        self._ups_by_name = {ups["name"]: ups for ups in self.ups_list}
+        self._reset_pool()
         self.logger.log_message(f"Initialized {len(self.ups_list)} UPS configuration(s)", "debug")
 
     def read_ups_data(self) -> None:
@@ -93,27 +236,68 @@ class UPSIntegration:
         if not self.enabled:
             return
 
-        # See if it's time to poll again based on the polling interval
-        current_time = DateHelper.now()
-        if self.time_last_polled and (current_time - self.time_last_polled).total_seconds() < self.polling_interval:
+        # See if it's time to poll again based on the polling interval. Use the monotonic clock so that
+        # wall clock adjustments can't stall or hurry the polling.
+        now_monotonic = time.monotonic()
+        if self._last_poll_monotonic is not None and now_monotonic - self._last_poll_monotonic < self.polling_interval:
             return
 
-        self.time_last_polled = current_time
-        project_root = SCCommon.get_project_root()
+        self._last_poll_monotonic = now_monotonic
+        self.time_last_polled = DateHelper.now()
 
-        for ups in self.ups_list:
-            try:
-                self._execute_ups_script(ups, project_root)
-            except subprocess.TimeoutExpired:
-                self.logger.log_message(f"UPS script timeout for '{ups['name']}'", "error")
-            except subprocess.CalledProcessError as e:
-                stderr = e.stderr.strip() if e.stderr else "No stderr output"
-                self.logger.log_message(f"UPS script failed for '{ups['name']}': exit code {e.returncode}. Error: {stderr}", "error")
-            except OSError as e:
-                self.logger.log_message(f"Error executing UPS script for '{ups['name']}': {e}", "error")
+        if self._pool is None:
+            for ups in self.ups_list:
+                self._poll_ups(ups)
+        else:
+            # The scripts spend their time waiting on I/O, so run them all at once and wait for the slowest
+            futures = [self._pool.submit(self._poll_ups, ups) for ups in self.ups_list]
+            for future in futures:
+                future.result()
 
         # Append the current readings to the CSV file if enabled and it's time to write
-        self._write_ups_data_to_csv()
+        self._write_ups_data_to_csv(now_monotonic)
+
+    def close(self) -> None:
+        """Shut down the worker threads used to run the UPS scripts and any NUT daemon connections."""
+        self._shutdown_pool()
+        self._close_nut_clients()
+
+    def _shutdown_pool(self) -> None:
+        """Shut down the worker pool, if any."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _close_nut_clients(self) -> None:
+        """Close the NUT daemon connection of each configured UPS."""
+        for ups in self.ups_list:
+            if ups.get("nut") is not None:
+                ups["nut"].close()
+
+    def _reset_pool(self) -> None:
+        """(Re)create the worker pool to suit the number of configured UPS devices."""
+        self._shutdown_pool()
+        if len(self.ups_list) > 1:
+            self._pool = ThreadPoolExecutor(max_workers=min(len(self.ups_list), MAX_POLL_WORKERS), thread_name_prefix="UPSScript")
+
+    def _poll_ups(self, ups: dict[str, Any]) -> None:
+        """Read one UPS from the NUT daemon or its script, logging any failure.
+
+        Args:
+            ups (dict): The UPS configuration entry.
+        """
+        try:
+            if ups.get("nut") is not None:
+                self._read_nut_device(ups)
+            else:
+                self._execute_ups_script(ups)
+        except subprocess.TimeoutExpired:
+            self.logger.log_message(f"UPS script timeout for '{ups['name']}'", "error")
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.strip() if e.stderr else "No stderr output"
+            self.logger.log_message(f"UPS script failed for '{ups['name']}': exit code {e.returncode}. Error: {stderr}", "error")
+        except OSError as e:
+            self.logger.log_message(f"Error reading UPS '{ups['name']}': {e}", "error")
 
     def get_ups_results(self, ups_name: str | None = None) -> dict[str, Any]:
         """Get the results for one or all UPS devices.
@@ -140,31 +324,14 @@ class UPSIntegration:
 
         if ups_name:
             # Return just the specified UPS
-            ups_entry = next((ups for ups in self.ups_list if ups["name"] == ups_name), None)
+            ups_entry = self._ups_by_name.get(ups_name)
             if not ups_entry:
                 msg = f"UPS '{ups_name}' not found in configuration"
                 raise RuntimeError(msg)
-            return {
-                ups_name: {
-                    "timestamp": ups_entry["timestamp"],
-                    "battery_charge_percent": ups_entry["battery_charge_percent"],
-                    "battery_runtime_seconds": ups_entry["battery_runtime_seconds"],
-                    "battery_state": ups_entry["battery_state"],
-                    "is_healthy": ups_entry["is_healthy"],
-                }
-            }
+            return {ups_name: {key: ups_entry[key] for key in UPS_RESULT_KEYS}}
 
         # Return all UPS results
-        results = {}
-        for ups in self.ups_list:
-            results[ups["name"]] = {
-                "timestamp": ups["timestamp"],
-                "battery_charge_percent": ups["battery_charge_percent"],
-                "battery_runtime_seconds": ups["battery_runtime_seconds"],
-                "battery_state": ups["battery_state"],
-                "is_healthy": ups["is_healthy"],
-            }
-        return results
+        return {name: {key: ups[key] for key in UPS_RESULT_KEYS} for name, ups in self._ups_by_name.items()}
 
     def is_ups_healthy(self, ups_name: str) -> bool:
         """Check if a specific UPS is healthy.
@@ -181,7 +348,7 @@ class UPSIntegration:
         if not self.enabled:
             return True
 
-        ups_entry = next((ups for ups in self.ups_list if ups["name"] == ups_name), None)
+        ups_entry = self._ups_by_name.get(ups_name)
         if not ups_entry:
             msg = f"UPS '{ups_name}' not found in configuration"
             raise RuntimeError(msg)
@@ -192,18 +359,21 @@ class UPSIntegration:
 
         return ups_entry["is_healthy"]
 
-    def _execute_ups_script(self, ups: dict[str, Any], project_root: Path) -> None:
-        """Execute UPS script and update UPS status.
+    @staticmethod
+    def _resolve_script_command(script: str, project_root: Path) -> list[str] | None:
+        """Split a UPS script setting into the command to run.
 
         Args:
-            ups (dict): The UPS configuration entry.
-            project_root (Path): The project root directory.
+            script (str): The Script setting, a path optionally followed by arguments.
+            project_root (Path): The project root directory, used to resolve relative script paths.
+
+        Returns:
+            list[str] | None: The command and its arguments, or None if the script is empty.
         """
         # Parse the script command and arguments
-        script_parts = ups["script"].split()
+        script_parts = script.split()
         if not script_parts:
-            self.logger.log_message(f"Empty script command for UPS '{ups['name']}'", "error")
-            return
+            return None
 
         # Resolve the script path relative to project root
         script_path = script_parts[0]
@@ -212,17 +382,32 @@ class UPSIntegration:
             script_path = str(project_root / script_path)
 
         # Build the full command with arguments
-        command = [script_path, *script_parts[1:]]
+        return [script_path, *script_parts[1:]]
+
+    def _execute_ups_script(self, ups: dict[str, Any]) -> None:
+        """Execute UPS script and update UPS status.
+
+        Args:
+            ups (dict): The UPS configuration entry.
+        """
+        # The command is resolved once in initialise()
+        command = ups["command"]
+        if not command:
+            self.logger.log_message(f"Empty script command for UPS '{ups['name']}'", "error")
+            return
 
         self.logger.log_message(f"Executing UPS script for '{ups['name']}': {' '.join(command)}", "all")
 
         # Execute the script and capture output
+        # The command path is always absolute, so with close_fds=False subprocess can use posix_spawn() rather than
+        # fork() + exec(). Python's own file descriptors are non-inheritable, so the script doesn't inherit them.
         result = subprocess.run(  # noqa: S603
             command,
             capture_output=True,
             text=True,
             timeout=30,
             check=True,
+            close_fds=False,
         )
 
         # Parse JSON output from stdout
@@ -231,20 +416,82 @@ class UPSIntegration:
 
             # Update UPS entry with data from script
             timestamp = DateHelper.extract_datetime(data.get("timestamp"), format_str="%Y-%m-%d %H:%M:%S", hide_tz=True)
-            ups["timestamp"] = timestamp
-            ups["battery_state"] = data.get("battery_state", "unknown") or "unknown"
-            ups["battery_charge_percent"] = data.get("battery_charge_percent", 100) or 100
-            ups["battery_runtime_seconds"] = data.get("battery_runtime_seconds", 3600) or 3600
-
-            # Determine health status based on thresholds
-            self._update_ups_health_status(ups)
+            self._apply_ups_reading(ups, timestamp, data.get("battery_state"), data.get("battery_charge_percent"), data.get("battery_runtime_seconds"))
 
         except json.JSONDecodeError as e:
             self.logger.log_message(f"Failed to parse JSON output from UPS script '{ups['name']}': {e}. Output was: {result.stdout}", "error")
 
+    def _read_nut_device(self, ups: dict[str, Any]) -> None:
+        """Read the UPS status from the NUT daemon over its persistent connection.
+
+        Args:
+            ups (dict): The UPS configuration entry.
+        """
+        values = ups["nut"].get_vars(("battery.charge", "battery.runtime", "ups.status"))
+        charge = self._parse_nut_number(values["battery.charge"])
+        runtime = self._parse_nut_number(values["battery.runtime"])
+        state = self._nut_battery_state(values["ups.status"], charge)
+        self._apply_ups_reading(ups, DateHelper.now().replace(tzinfo=None), state, charge, runtime)
+
+    @staticmethod
+    def _parse_nut_number(value: str | None) -> float | None:
+        """Convert a NUT variable value to a number.
+
+        Args:
+            value (str | None): The value as returned by the daemon.
+
+        Returns:
+            float | None: The number, or None if the value is missing or not numeric.
+        """
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _nut_battery_state(status: str | None, charge: float | None) -> str:
+        """Map a NUT ups.status value to a battery state, matching shell_scripts/ups_runtime.sh.
+
+        Args:
+            status (str | None): The ups.status value, e.g. "OL", "OL CHRG" or "OB DISCHRG".
+            charge (float | None): The battery charge percent.
+
+        Returns:
+            str: One of "charging", "discharging", "charged" or "unknown".
+        """
+        if not status:
+            return "unknown"
+        if status == "OL":
+            return "charging" if charge is not None and charge < 99 else "charged"
+        if status.startswith("OL CHRG"):
+            return "charging"
+        if status.startswith("OB DISCHRG") or status == "OB":
+            return "discharging"
+        return "unknown"
+
+    def _apply_ups_reading(self, ups: dict[str, Any], timestamp: dt.datetime | None, state: str | None, charge: float | None, runtime: float | None) -> None:
+        """Store a new reading in the UPS entry and update its health status.
+
+        Args:
+            ups (dict): The UPS configuration entry.
+            timestamp (dt.datetime | None): When the reading was taken.
+            state (str | None): The battery state.
+            charge (float | None): The battery charge percent.
+            runtime (float | None): The remaining battery runtime in seconds.
+        """
+        ups["timestamp"] = timestamp
+        ups["battery_state"] = state or "unknown"
+        ups["battery_charge_percent"] = charge or 100
+        ups["battery_runtime_seconds"] = runtime or 3600
+
+        # Determine health status based on thresholds
+        self._update_ups_health_status(ups)
+
     def _update_ups_health_status(self, ups: dict[str, Any]) -> None:
         """Update the health status of a UPS based on thresholds.
 
+        Warnings are only logged when the UPS becomes unhealthy or its state becomes unknown, not on every poll.
+
         Args:
             ups (dict): The UPS configuration entry with current readings.
         """
@@ -252,68 +499,65 @@ class UPSIntegration:
         runtime = ups.get("battery_runtime_seconds")
         battery_state = ups["battery_state"]
 
+        # Nothing to do if the reading is the same as last time
+        reading_key = (charge, runtime, battery_state)
+        last_reading_key = ups.get("last_reading_key")
+        if reading_key == last_reading_key:
+            return
+        ups["last_reading_key"] = reading_key
+        was_healthy = ups["is_healthy"]
+
         # The default condition is that the UPS is healthy until we find a reason it's not
         is_healthy = True
-        ups["is_healthy"] = is_healthy
+        problems = []
 
         # Deal with no data available yet
         if charge is None or runtime is None or battery_state is None:
-            return
+            pass
 
         # If battery state is unknown, we can't determine health, so we will consider it healthy but log a warning
-        if battery_state == "unknown":
-            self.logger.log_message(f"UPS '{ups['name']}' battery state is unknown. Unable to determine health status.", "warning")        
-            return
+        elif battery_state == "unknown":
+            if last_reading_key is None or last_reading_key[2] != "unknown":
+                self.logger.log_message(f"UPS '{ups['name']}' battery state is unknown. Unable to determine health status.", "warning")
 
-        # If battery is fully charged, then it's healthy regardless of runtime or charge thresholds
-        if battery_state == "charged":
-            return
-
-        # Deal with charging scenario
-        if battery_state == "charging":
-            min_charge = ups.get("min_charge_when_charging", 0) or 0
-            min_runtime = ups.get("min_runtime_when_charging", 0) or 0
+        # Check the charging / discharging thresholds. Any other state (e.g. fully charged) is healthy
+        # regardless of runtime or charge thresholds.
+        elif (thresholds := ups["thresholds"].get(battery_state)) is not None:
+            min_charge, min_runtime = thresholds
 
             if min_charge > 0 and charge < min_charge:
                 is_healthy = False
-                self.logger.log_message(f"UPS '{ups['name']}' charge ({charge}%) below threshold ({min_charge}%) while charging", "warning")
+                problems.append(f"charge ({charge}%) below threshold ({min_charge}%)")
 
             if min_runtime > 0 and runtime < min_runtime:
                 is_healthy = False
-                self.logger.log_message(f"UPS '{ups['name']}' runtime ({runtime}s) below threshold ({min_runtime}s) while charging", "warning")
-
-            ups["is_healthy"] = is_healthy
+                problems.append(f"runtime ({runtime}s) below threshold ({min_runtime}s)")
 
-        # Deal with discharging scenario
-        if battery_state == "discharging":
-            min_charge = ups.get("min_charge_when_discharging", 0) or 0
-            min_runtime = ups.get("min_runtime_when_discharging", 0) or 0
+        if was_healthy and not is_healthy:
+            self.logger.log_message(f"UPS '{ups['name']}' is unhealthy: {' and '.join(problems)} while {battery_state}", "warning")
+        elif is_healthy and not was_healthy:
+            self.logger.log_message(f"UPS '{ups['name']}' is healthy again ({battery_state}, charge {charge}%, runtime {runtime}s)", "summary")
 
-            if min_charge > 0 and charge < min_charge:
-                is_healthy = False
-                self.logger.log_message(f"UPS '{ups['name']}' charge ({charge}%) below threshold ({min_charge}%) while discharging", "warning")
-
-            if min_runtime > 0 and runtime < min_runtime:
-                is_healthy = False
-                self.logger.log_message(f"UPS '{ups['name']}' runtime ({runtime}s) below threshold ({min_runtime}s) while discharging", "warning")
+        ups["is_healthy"] = is_healthy
 
-            ups["is_healthy"] = is_healthy
+    def _write_ups_data_to_csv(self, now_monotonic: float) -> None:
+        """Write UPS data to CSV file if enabled and it's time to write.
 
-    def _write_ups_data_to_csv(self) -> None:
-        """Write UPS data to CSV file if enabled and it's time to write."""
+        Args:
+            now_monotonic (float): The time.monotonic() value for this poll.
+        """
         # If CSV writing is enabled, check if it's time to write to the CSV file based on the write interval
-        if not self.data_file["enabled"]:
+        if not self.data_file.enabled:
             return
 
-        # See if it's time to poll again based on the polling interval
-        current_time = DateHelper.now()
-
-        if self.data_file["last_write_time"] and (current_time - self.data_file["last_write_time"]).total_seconds() < self.data_file["write_interval"]:
+        last_write = self.data_file.last_write_monotonic
+        if last_write is not None and now_monotonic - last_write < self.data_file.write_interval:
             return
-        self.data_file["last_write_time"] = current_time
+        self.data_file.last_write_monotonic = now_monotonic
 
         # Build the UPS data to write
         ups_data = []
+        local_tz = dt.datetime.now().astimezone().tzinfo
         for ups in self.ups_list:
             if ups["battery_state"] is None or ups["battery_state"] == "unknown":   # Issue 85
                 self.logger.log_message(f"Skipping UPS '{ups['name']}' for CSV write due to unknown battery state", "warning")
@@ -321,7 +565,6 @@ class UPSIntegration:
 
             ups_timestamp_tz = ups["timestamp"]  # Issue 81
             if isinstance(ups_timestamp_tz, dt.datetime):
-                local_tz = dt.datetime.now().astimezone().tzinfo
                 if ups_timestamp_tz.tzinfo is None:
                     ups["timestamp"] = ups_timestamp_tz.replace(tzinfo=local_tz)
                 else:
@@ -340,12 +583,39 @@ class UPSIntegration:
         if not ups_data:       # Issue 85
             return
 
-        # Create a CSVReasder object and read the current content of the CSV file to append to it.
-        schemas = ConfigSchema()
-        csv_reader = CSVReader(self.data_file["file_name"], schemas.ups_data_file_csv_config)
+        if self._csv_reader is None:
+            schemas = ConfigSchema()
+            assert self.data_file.file_name is not None, "data_file.enabled implies a file name"
+            self._csv_reader = CSVReader(self.data_file.file_name, schemas.ups_data_file_csv_config)
+
+        # Re-reading, trimming and merging the whole file is only needed to drop rows older than keep_max_days,
+        # so do that at most once an hour (or if the file has gone). In between, just append the new rows.
+        last_trim = self._csv_last_trim_monotonic
+        if last_trim is None or now_monotonic - last_trim >= CSV_TRIM_INTERVAL or not self._csv_reader.file_path.is_file():
+            max_days = self.data_file.keep_max_days
+            self._csv_reader.update_csv_file(ups_data, max_days=max_days)
+            self._csv_last_trim_monotonic = now_monotonic
+        else:
+            self._append_ups_data_to_csv(ups_data)
 
-        # Read the existing CSV data to append to it.
-        max_days = self.data_file["keep_max_days"]
-        csv_reader.update_csv_file(ups_data, max_days=max_days)
+        # self.logger.log_message(f"Wrote UPS data to CSV file '{self.data_file.file_name}'", "debug")
 
-        # self.logger.log_message(f"Wrote UPS data to CSV file '{self.data_file['file_name']}'", "debug")
+    def _append_ups_data_to_csv(self, ups_data: list[dict[str, Any]]) -> None:
+        """Append rows to the end of the existing UPS data file, formatted the same way as CSVReader.write_csv().
+
+        Args:
+            ups_data (list[dict[str, Any]]): The rows to append.
+        """
+        assert self._csv_reader is not None
+        header_config = self._csv_reader.header_config
+        with self._csv_reader.file_path.open("a", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=[header["name"] for header in header_config], extrasaction="ignore")
+            for row in ups_data:
+                formatted_row = dict(row)
+                for header in header_config:
+                    value = row[header["name"]]
+                    if header["type"] == "datetime" and isinstance(value, dt.datetime):
+                        formatted_row[header["name"]] = value.strftime(header.get("format", "%Y-%m-%d %H:%M:%S"))
+                    elif header["type"] == "float" and "format" in header:
+                        formatted_row[header["name"]] = format(value, header["format"])
+                writer.writerow(formatted_row)
@@ -11,12 +11,14 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import hmac
 import json
 import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+import jinja2
 import uvicorn
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
@@ -34,15 +36,15 @@ if TYPE_CHECKING:
     from controller import PowerController
 
 
+DEFAULT_BROADCAST_MIN_INTERVAL_MS = 100  # Minimum time between WebSocket state broadcasts
+
+
 def _get_repo_root() -> Path:
     # src/webapp.py -> repo_root
     return Path(__file__).resolve().parent.parent
 
 
-def _validate_access_key(config: SCConfigManager, logger: SCLogger, key_from_request: str | None) -> bool:
-    expected_key = os.environ.get("WEBAPP_ACCESS_KEY")
-    if not expected_key:
-        expected_key = config.get("Website", "AccessKey")
+def _validate_access_key(expected_key: Any, logger: SCLogger, key_from_request: str | None) -> bool:
     if expected_key is None:
         return True
     if isinstance(expected_key, str) and not expected_key.strip():
@@ -56,18 +58,21 @@ def _validate_access_key(config: SCConfigManager, logger: SCLogger, key_from_req
     if not key:
         logger.log_message("Blank access key used.", "warning")
         return False
-    if key != expected_key:
+    # Constant time comparison so response timing doesn't reveal how much of the key matched
+    if not isinstance(expected_key, str) or not hmac.compare_digest(key.encode(), expected_key.encode()):
         logger.log_message("Invalid access key used.", "warning")
         return False
     return True
 
 
+_VALID_MODES = frozenset(m.value for m in AppMode)
+
+
 def _sanitize_mode(mode: Any) -> str | None:
     if not isinstance(mode, str):
         return None
     mode_s = mode.strip().lower()
-    valid_modes = {m.value for m in AppMode}
-    return mode_s if mode_s in valid_modes else None
+    return mode_s if mode_s in _VALID_MODES else None
 
 
 @dataclass
@@ -75,50 +80,96 @@ class WebAppNotifier:
     """Thread-safe notifier used by PowerController to trigger WS broadcasts."""
 
     loop: asyncio.AbstractEventLoop | None = None
-    queue: asyncio.Queue[None] | None = None
+    event: asyncio.Event | None = None
 
-    def bind(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue[None]) -> None:
+    def bind(self, loop: asyncio.AbstractEventLoop, event: asyncio.Event) -> None:
         self.loop = loop
-        self.queue = queue
+        self.event = event
 
     def notify(self) -> None:
         loop = self.loop
-        queue = self.queue
-        if loop is None or queue is None:
+        event = self.event
+        if loop is None or event is None:
             return
 
-        def _enqueue() -> None:
-            # If we're already backed up, a later snapshot will catch up.
-            with contextlib.suppress(asyncio.QueueFull):
-                queue.put_nowait(None)
+        # Setting an already set event is a no-op, so bursts of notifications coalesce into one snapshot.
+        loop.call_soon_threadsafe(event.set)
+
+
+class SnapshotCache:
+    """Caches controller.get_webapp_data() until the controller's webapp_state_version changes."""
 
-        loop.call_soon_threadsafe(_enqueue)
+    def __init__(self, controller: PowerController) -> None:
+        self._controller = controller
+        self._version: int | None = None
+        self._snapshot: dict[str, Any] | None = None
+        self._message: tuple[dict[str, Any] | None, str] | None = None  # (snapshot, encoded state_update message)
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> dict[str, Any] | None:
+        """Return the current snapshot, building it in a worker thread only if the state has changed and the controller has not published it.
+
+        Returns:
+            The snapshot dict, which callers must not modify, or None if no data is available yet.
+        """
+        version = self._controller.webapp_state_version
+        if self._snapshot is not None and version == self._version:
+            return self._snapshot
+
+        # Use the snapshot the controller published after its last tick if nothing has changed since
+        published = self._controller.published_webapp_data
+        if published is not None and published[0] == version:
+            self._version, self._snapshot = published
+            return self._snapshot
+
+        # Serialise the builds so that a burst of requests (e.g. several tabs reconnecting) only builds once
+        async with self._lock:
+            if self._snapshot is not None and version == self._version:
+                return self._snapshot
+            # Read the version before building, so a change during the build triggers another build next time
+            version = self._controller.webapp_state_version
+            snapshot = await asyncio.to_thread(self._controller.get_webapp_data)
+            self._version, self._snapshot = version, snapshot
+            return snapshot
+
+    async def get_message(self) -> str:
+        """Return the current snapshot as an encoded state_update WebSocket message.
+
+        The message is encoded once per snapshot and shared by the broadcast worker and newly connected clients.
+
+        Returns:
+            The JSON text of the message.
+        """
+        snapshot = await self.get()
+        if self._message is None or self._message[0] is not snapshot:
+            self._message = (snapshot, json.dumps({"type": "state_update", "state": snapshot}))
+        return self._message[1]
 
 
 class ConnectionManager:
     def __init__(self) -> None:
-        self._connections: set[WebSocket] = set()
-        self._lock = asyncio.Lock()
+        # Only ever touched from the event loop, and replaced rather than mutated, so a broadcast can
+        # iterate over the tuple it read without holding a lock.
+        self._connections: tuple[WebSocket, ...] = ()
 
     async def connect(self, ws: WebSocket) -> None:
         await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
+        if ws not in self._connections:
+            self._connections = (*self._connections, ws)
 
     async def disconnect(self, ws: WebSocket) -> None:
-        async with self._lock:
-            self._connections.discard(ws)
+        self._connections = tuple(w for w in self._connections if w is not ws)
 
-    async def broadcast_json(self, message: dict[str, Any]) -> None:
-        text = json.dumps(message)
-        async with self._lock:
-            targets = list(self._connections)
+    async def broadcast_text(self, text: str) -> None:
+        targets = self._connections
 
-        for ws in targets:
-            try:
-                await ws.send_text(text)
-            except (RuntimeError, WebSocketDisconnect):
+        # Send to all clients concurrently so that one slow client doesn't hold up the rest
+        results = await asyncio.gather(*(ws.send_text(text) for ws in targets), return_exceptions=True)
+        for ws, result in zip(targets, results, strict=True):
+            if isinstance(result, (RuntimeError, WebSocketDisconnect)):
                 await self.disconnect(ws)
+            elif isinstance(result, BaseException):
+                raise result
 
 
 def _configure_app_state(
@@ -136,43 +187,60 @@ def _configure_app_state(
     app.state.config = config
     app.state.logger = logger
     app.state.templates = templates
-    app.state.update_queue = asyncio.Queue(maxsize=100)
+    app.state.update_event = asyncio.Event()
+    app.state.snapshot_cache = SnapshotCache(controller)
     app.state.broadcast_task = None
 
 
 def _register_routes(app: FastAPI, controller: PowerController, config: SCConfigManager, logger: SCLogger, templates: Jinja2Templates, manager: ConnectionManager, notifier: WebAppNotifier) -> None:
+    env_access_key = os.environ.get("WEBAPP_ACCESS_KEY")
+    config_access_key: tuple[Any, Any] | None = None  # (controller.last_config_check, Website: AccessKey)
+
+    def _expected_access_key() -> Any:
+        # The environment variable is resolved once when the app is created. The config value is cached until the
+        # controller reloads the config file, which updates last_config_check.
+        nonlocal config_access_key
+        if env_access_key:
+            return env_access_key
+        config_version = controller.last_config_check
+        if config_access_key is None or config_access_key[0] != config_version:
+            config_access_key = (config_version, config.get("Website", "AccessKey"))
+        return config_access_key[1]
+
+    index_html: tuple[dict[str, Any], str] | None = None  # (snapshot, index.html rendered from it)
+
     @app.get("/", response_class=HTMLResponse)
     async def index(request: Request) -> Any:
+        nonlocal index_html
         key = request.query_params.get("key")
-        if not _validate_access_key(config, logger, key):
+        if not _validate_access_key(_expected_access_key(), logger, key):
             return HTMLResponse("Access forbidden.", status_code=403)
 
-        snapshot = await asyncio.to_thread(controller.get_webapp_data)
+        snapshot = await app.state.snapshot_cache.get()
         if not snapshot:
             logger.log_message("No web output data available yet", "warning")
             return HTMLResponse("no output data available yet", status_code=503)
 
-        return templates.TemplateResponse(
-            request,
-            "index.html",
-            {
-                "global_data": snapshot.get("global", {}),
-                "outputs": snapshot.get("outputs", {}),
-            },
-        )
+        # The page only depends on the snapshot, so render it once per snapshot rather than per request
+        if index_html is None or index_html[0] is not snapshot:
+            html = templates.get_template("index.html").render(
+                global_data=snapshot.get("global", {}),
+                outputs=snapshot.get("outputs", {}),
+            )
+            index_html = (snapshot, html)
+        return HTMLResponse(index_html[1])
 
     @app.websocket("/ws")
     async def websocket_endpoint(ws: WebSocket) -> None:
         key = ws.query_params.get("key")
-        if not _validate_access_key(config, logger, key):
+        if not _validate_access_key(_expected_access_key(), logger, key):
             await ws.close(code=1008)
             return
 
         await manager.connect(ws)
         try:
             # Send initial snapshot
-            snapshot = await asyncio.to_thread(controller.get_webapp_data)
-            await ws.send_text(json.dumps({"type": "state_update", "state": snapshot}))
+            await ws.send_text(await app.state.snapshot_cache.get_message())
 
             while True:
                 raw = await ws.receive_text()
@@ -202,28 +270,31 @@ def _register_routes(app: FastAPI, controller: PowerController, config: SCConfig
 
 def create_asgi_app(controller: PowerController, config: SCConfigManager, logger: SCLogger) -> tuple[FastAPI, WebAppNotifier]:
     repo_root = _get_repo_root()
-    templates = Jinja2Templates(directory=str(repo_root / "templates"))
+    # The templates only change on deployment, so don't stat() them on every render to check for edits
+    template_env = jinja2.Environment(loader=jinja2.FileSystemLoader(str(repo_root / "templates")), autoescape=True, auto_reload=False)
+    templates = Jinja2Templates(env=template_env)
     notifier = WebAppNotifier()
     manager = ConnectionManager()
+    min_interval_ms = config.get("Website", "BroadcastMinIntervalMs", default=DEFAULT_BROADCAST_MIN_INTERVAL_MS)
+    broadcast_min_interval = max(0.0, float(min_interval_ms if min_interval_ms is not None else DEFAULT_BROADCAST_MIN_INTERVAL_MS)) / 1000.0  # pyright: ignore[reportArgumentType]
 
     @contextlib.asynccontextmanager
     async def _lifespan(app: FastAPI):
         loop = asyncio.get_running_loop()
-        notifier.bind(loop, app.state.update_queue)
+        notifier.bind(loop, app.state.update_event)
 
         async def _broadcast_worker() -> None:
             try:
                 while True:
-                    await app.state.update_queue.get()
-                    # Coalesce bursts into a single snapshot
-                    while True:
-                        try:
-                            app.state.update_queue.get_nowait()
-                        except asyncio.QueueEmpty:
-                            break
-
-                    snapshot = await asyncio.to_thread(controller.get_webapp_data)
-                    await manager.broadcast_json({"type": "state_update", "state": snapshot})
+                    await app.state.update_event.wait()
+                    # Clear before taking the snapshot so that a notify() during the build triggers another one
+                    app.state.update_event.clear()
+
+                    await manager.broadcast_text(await app.state.snapshot_cache.get_message())
+
+                    # Rate limit the snapshot builds. Any notifications in the meantime just leave the event set.
+                    if broadcast_min_interval:
+                        await asyncio.sleep(broadcast_min_interval)
             except asyncio.CancelledError:
                 # Expected during shutdown.
                 return
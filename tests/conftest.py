@@ -198,4 +198,6 @@ def make_mock_controller(api_data: dict | None = None, webapp_data: dict | None
     }
     ctrl.is_valid_output_id.return_value = True
     ctrl.post_command.return_value = None
+    ctrl.published_webapp_data = None
+    ctrl.data_api_generation = 0
     return ctrl
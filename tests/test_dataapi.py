@@ -4,6 +4,7 @@ Uses FastAPI's TestClient (synchronous) to exercise all endpoints without
 starting a real server.
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -16,7 +17,7 @@ SRC_DIR = Path(__file__).resolve().parents[1] / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from dataapi import create_asgi_app
+from dataapi import ResponseCache, create_asgi_app
 
 # ---------------------------------------------------------------------------
 # Helpers / fixtures
@@ -67,6 +68,7 @@ def _make_controller(data_map: dict | None = None, all_data: dict | None = None)
         return data_map.get(entry, {})
 
     ctrl.get_api_data.side_effect = _get_api_data
+    ctrl.data_api_generation = 1
     return ctrl
 
 
@@ -155,6 +157,40 @@ class TestOutputsEndpoint:
         resp = empty_data_client.get("/outputs")
         assert resp.status_code == 503
 
+    def test_response_cached_until_data_refreshed(self, logger):
+        ctrl = _make_controller()
+        cfg = MagicMock()
+        cfg.get.side_effect = lambda *_keys, default=None: default
+        c = TestClient(create_asgi_app(ctrl, cfg, logger))
+
+        first = c.get("/outputs")
+        second = c.get("/outputs")
+        assert first.content == second.content
+        assert ctrl.get_api_data.call_count == 1
+
+        ctrl.data_api_generation = 2
+        c.get("/outputs")
+        assert ctrl.get_api_data.call_count == 2
+
+    def test_response_built_during_refresh_not_cached(self):
+        ctrl = _make_controller()
+        get_api_data = ctrl.get_api_data.side_effect
+
+        def _refresh_while_building(entry=None):
+            ctrl.data_api_generation += 1
+            return get_api_data(entry)
+
+        ctrl.get_api_data.side_effect = _refresh_while_building
+        cache = ResponseCache(ctrl)
+        assert asyncio.run(cache.get("Outputs")) is not None
+        assert "Outputs" not in cache._bodies
+
+    def test_matching_etag_returns_304(self, client):
+        etag = client.get("/outputs").headers["etag"]
+        resp = client.get("/outputs", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+
 
 # ---------------------------------------------------------------------------
 # /meters
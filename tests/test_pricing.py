@@ -0,0 +1,96 @@
+"""Tests for PricingManager — looking up prices from the Amber price data."""
+
+import datetime as dt
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from local_enumerations import AmberChannel
+from pricing import PricingManager
+
+TZ = dt.timezone(dt.timedelta(hours=10))
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _at(hour: int, minute: int = 0) -> dt.datetime:
+    return dt.datetime(2026, 3, 6, hour, minute, tzinfo=TZ)
+
+
+def _entry(start: dt.datetime, price: float | None, minutes: int = 30) -> dict:
+    return {"StartDateTime": start, "EndDateTime": start + dt.timedelta(minutes=minutes), "Price": price}
+
+
+# 10:00-11:00 in two intervals, a gap until 11:30, then 11:30-12:00
+PRICE_DATA = [
+    _entry(_at(10), 20.0),
+    _entry(_at(10, 30), 30.0),
+    _entry(_at(11, 30), 40.0),
+]
+
+
+def _make_pricing(price_data: list[dict]) -> PricingManager:
+    cfg = MagicMock()
+    cfg.get.side_effect = lambda *_keys, default=None: default
+    pricing = PricingManager(cfg, MagicMock())
+    pricing.raw_price_data = [{"Name": AmberChannel.GENERAL, "PriceData": price_data}]
+    pricing.today_forecast_data = [{"Name": AmberChannel.GENERAL}]
+    return pricing
+
+
+# ---------------------------------------------------------------------------
+# get_prices
+# ---------------------------------------------------------------------------
+
+class TestGetPrices:
+    @pytest.mark.parametrize(
+        ("as_at_time", "expected"),
+        [
+            (_at(10), 20.0),            # Start of the first entry
+            (_at(10, 29), 20.0),
+            (_at(10, 30), 30.0),        # End of one entry is the start of the next
+            (_at(11), 0.0),             # End of an entry with a gap after it
+            (_at(11, 15), 0.0),         # In the gap
+            (_at(12), 0.0),             # End of the last entry
+            (_at(9, 59), 0.0),          # Before the first entry
+            (_at(13), 0.0),             # After the last entry
+        ],
+    )
+    def test_matches_get_price(self, as_at_time, expected):
+        pricing = _make_pricing(PRICE_DATA)
+        assert pricing.get_prices([as_at_time]) == [expected]
+        assert pricing.get_price(as_at_time) == expected
+
+    def test_unsorted_price_data(self):
+        pricing = _make_pricing(list(reversed(PRICE_DATA)))
+        times = [_at(11, 45), _at(9), _at(10, 15), _at(11, 15), _at(10, 45)]
+        assert pricing.get_prices(times) == [pricing.get_price(t) for t in times] == [40.0, 0.0, 20.0, 0.0, 30.0]
+
+    def test_missing_price_is_zero(self):
+        pricing = _make_pricing([_entry(_at(10), None)])
+        assert pricing.get_prices([_at(10)]) == [pricing.get_price(_at(10))] == [0.0]
+
+    def test_invalid_channel(self):
+        pricing = _make_pricing(PRICE_DATA)
+        times = [_at(10), _at(11, 45)]
+        assert [pricing.get_price(t, channel_id=AmberChannel.CONTROLLED_LOAD) for t in times] == [0.0, 0.0]
+        pricing.logger.log_message.reset_mock()
+
+        # Logged once for the whole list rather than once per time
+        assert pricing.get_prices(times, channel_id=AmberChannel.CONTROLLED_LOAD) == [0.0, 0.0]
+        errors = [call for call in pricing.logger.log_message.call_args_list if call.args[1] == "error"]
+        assert len(errors) == 1
+
+    def test_no_times_returns_empty_list_without_logging(self):
+        pricing = _make_pricing(PRICE_DATA)
+        assert pricing.get_prices([], channel_id=AmberChannel.CONTROLLED_LOAD) == []
+        errors = [call for call in pricing.logger.log_message.call_args_list if call.args[1] == "error"]
+        assert errors == []
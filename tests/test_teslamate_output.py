@@ -0,0 +1,289 @@
+"""Tests for TeslaMateOutput — history rebuilds and the caches that let them be skipped."""
+
+import datetime as dt
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from sc_foundation import DateHelper
+
+import teslamate_output
+from teslamate_output import TeslaMateOutput, _as_local_dt
+
+# The fake clock and all the test datetimes use this offset, so _as_local_dt() returns them as-is
+TZ = dt.timezone(dt.timedelta(hours=10))
+START = dt.datetime(2026, 3, 6, 9, 0, tzinfo=TZ)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _Clock:
+    """Stands in for DateHelper in teslamate_output, with a settable current time."""
+
+    def __init__(self, now: dt.datetime):
+        self.current = now
+
+    def now(self) -> dt.datetime:
+        return self.current
+
+    def today(self) -> dt.date:
+        return self.current.date()
+
+    def advance(self, **kwargs) -> None:
+        self.current += dt.timedelta(**kwargs)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock(START + dt.timedelta(hours=3))
+    monkeypatch.setattr(teslamate_output, "DateHelper", fake)
+    return fake
+
+
+def _make_config():
+    cfg = MagicMock()
+    cfg.get.side_effect = lambda *_keys, default=None: default
+    return cfg
+
+
+def _make_pricing():
+    pricing = MagicMock()
+    pricing.price_data_version = 1
+    pricing.get_prices.side_effect = lambda times, channel_id=None: [25.0] * len(times)
+    return pricing
+
+
+def _session(sid=1, car_id=1, start=START, end: dt.datetime | None = START + dt.timedelta(hours=1)) -> dict:
+    return {"id": sid, "car_id": car_id, "start_date": start, "end_date": end}
+
+
+def _bucket(sid=1, start=START, minutes=5, kwh=1.5) -> dict:
+    return {
+        "charging_process_id": sid,
+        "bucket_start": start,
+        "bucket_end": start + dt.timedelta(minutes=minutes),
+        "kwh_added": kwh,
+        "avg_kw": 18.0,
+    }
+
+
+def _charge_data(sessions=None, buckets=None) -> dict:
+    return {
+        "last_import": START + dt.timedelta(hours=2),
+        "sessions": sessions if sessions is not None else [_session()],
+        "buckets": buckets if buckets is not None else [_bucket()],
+    }
+
+
+def _make_output(charge_data: dict, car_id=None) -> TeslaMateOutput:
+    output_config = {"Name": "Tesla", "Type": "teslamate"}
+    if car_id is not None:
+        output_config["CarID"] = car_id
+    output = TeslaMateOutput(output_config, _make_config(), MagicMock(), MagicMock(), _make_pricing(), charge_data)
+    # Count the rebuilds that happen after construction
+    output._save_history = MagicMock(wraps=output._save_history)
+    return output
+
+
+def _tick(output: TeslaMateOutput, clock: _Clock) -> None:
+    """Run one controller tick, far enough after the last one to get past the once-per-second guard."""
+    clock.advance(seconds=10)
+    output.calculate_running_totals(None)
+
+
+# ---------------------------------------------------------------------------
+# Local datetime conversion (real DateHelper)
+# ---------------------------------------------------------------------------
+
+class TestAsLocalDt:
+    def test_local_offset_from_another_tzinfo_is_not_converted(self, monkeypatch):
+        local_tz = DateHelper.now().tzinfo
+        assert local_tz is not None
+        now = DateHelper.now()
+        # Same offset, different tzinfo object - as psycopg or the state decoder would return
+        value = now.replace(tzinfo=dt.timezone(now.utcoffset() or dt.timedelta()))
+        assert value.tzinfo is not local_tz
+
+        convert = MagicMock(side_effect=DateHelper.convert_timezone)
+        monkeypatch.setattr(DateHelper, "convert_timezone", convert)
+        assert _as_local_dt(value, local_tz) is value
+        convert.assert_not_called()
+
+    def test_other_offset_is_converted_to_local(self):
+        local_tz = DateHelper.now().tzinfo
+        assert local_tz is not None
+        now = DateHelper.now()
+        other_offset = (now.utcoffset() or dt.timedelta()) + dt.timedelta(hours=1)
+        value = now.astimezone(dt.timezone(other_offset))
+
+        result = _as_local_dt(value, local_tz)
+        assert result == value
+        assert result is not None and result.utcoffset() == now.utcoffset()
+
+    def test_cached_string_parse_follows_local_offset_change(self, monkeypatch):
+        value = "2026-04-04T14:30:00+00:00"
+        monkeypatch.setattr(DateHelper, "get_local_timezone", lambda: dt.timezone(dt.timedelta(hours=11)))
+        assert _as_local_dt(value) == dt.datetime(2026, 4, 5, 1, 30, tzinfo=dt.timezone(dt.timedelta(hours=11)))
+
+        # The local offset changes (e.g. daylight saving ends) while the parsed string is still cached
+        monkeypatch.setattr(DateHelper, "get_local_timezone", lambda: dt.timezone(dt.timedelta(hours=10)))
+        result = _as_local_dt(value)
+        assert result is not None
+        assert result.utcoffset() == dt.timedelta(hours=10)
+        assert result.date() == dt.date(2026, 4, 5)
+        assert result.hour == 0
+
+
+# ---------------------------------------------------------------------------
+# History rebuild signature
+# ---------------------------------------------------------------------------
+
+class TestRebuildSignature:
+    def test_unchanged_inputs_skip_rebuild(self, clock):
+        output = _make_output(_charge_data())
+        _tick(output, clock)
+        _tick(output, clock)
+        assert output._save_history.call_count == 0
+        assert output.run_history["CurrentTotals"]["EnergyUsed"] == 1500
+
+    def test_new_buckets_list_rebuilds(self, clock):
+        data = _charge_data()
+        output = _make_output(data)
+
+        data["buckets"] = [*data["buckets"], _bucket(start=START + dt.timedelta(minutes=5), kwh=2.0)]
+        _tick(output, clock)
+        assert output._save_history.call_count == 1
+        assert output.run_history["CurrentTotals"]["EnergyUsed"] == 3500
+
+    def test_new_sessions_list_rebuilds(self, clock):
+        data = _charge_data()
+        output = _make_output(data)
+
+        data["sessions"] = [*data["sessions"], _session(sid=2, start=START + dt.timedelta(hours=2))]
+        _tick(output, clock)
+        assert output._save_history.call_count == 1
+
+    def test_last_import_change_rebuilds(self, clock):
+        data = _charge_data()
+        output = _make_output(data)
+
+        data["last_import"] = clock.now()
+        _tick(output, clock)
+        assert output._save_history.call_count == 1
+
+    def test_price_data_version_bump_rebuilds(self, clock):
+        output = _make_output(_charge_data())
+
+        output.pricing.price_data_version += 1
+        output.pricing.get_prices.side_effect = lambda times, channel_id=None: [50.0] * len(times)
+        _tick(output, clock)
+        assert output._save_history.call_count == 1
+        assert output.run_history["CurrentTotals"]["TotalCost"] == pytest.approx(0.75)
+
+    def test_day_rollover_rebuilds(self, clock):
+        output = _make_output(_charge_data())
+
+        clock.current = clock.current.replace(hour=23, minute=59, second=45)
+        _tick(output, clock)
+        assert output._save_history.call_count == 0
+
+        _tick(output, clock)
+        assert clock.today() == START.date() + dt.timedelta(days=1)
+        assert output._save_history.call_count == 1
+
+    def test_in_progress_run_rebuilds_every_tick(self, clock):
+        # A session with no end date whose latest bucket finished a few minutes ago
+        now = clock.now()
+        data = _charge_data(
+            sessions=[_session(start=now - dt.timedelta(minutes=30), end=None)],
+            buckets=[_bucket(start=now - dt.timedelta(minutes=10))],
+        )
+        output = _make_output(data)
+        assert output._rebuild_has_in_progress is True
+
+        _tick(output, clock)
+        _tick(output, clock)
+        assert output._save_history.call_count == 2
+        assert output.run_history["DailyData"][-1]["DeviceRuns"][-1]["EndTime"] is None
+
+
+# ---------------------------------------------------------------------------
+# Filter cache
+# ---------------------------------------------------------------------------
+
+class TestFilterCache:
+    def test_same_length_lists_with_new_last_import_refilter(self, clock):
+        data = _charge_data()
+        output = _make_output(data)
+        assert [s["id"] for s in output._filtered_sessions()] == [1]
+        assert output._current_state_from_charge_data() == (False, "Not charging")
+
+        # Worst case for the id()/len() parts of the key: same list objects and lengths, new contents.
+        # Only the new last_import tells the imports apart.
+        now = clock.now()
+        data["sessions"][:] = [_session(sid=2, start=now - dt.timedelta(minutes=30), end=None)]
+        data["buckets"][:] = [_bucket(sid=2, start=now - dt.timedelta(minutes=10))]
+        data["last_import"] = now
+
+        assert [s["id"] for s in output._filtered_sessions()] == [2]
+        assert [b["charging_process_id"] for b in output._filtered_buckets()] == [2]
+        assert output._session_id_sets() == (frozenset({2}), frozenset({2}))
+        assert output._current_state_from_charge_data() == (True, "Charging")
+
+    def test_car_id_change_refilters(self, clock):
+        data = _charge_data(
+            sessions=[_session(sid=1, car_id=1), _session(sid=2, car_id=2, start=START + dt.timedelta(hours=1))],
+            buckets=[_bucket(sid=1), _bucket(sid=2, start=START + dt.timedelta(hours=1))],
+        )
+        output = _make_output(data, car_id=1)
+        assert [s["id"] for s in output._filtered_sessions()] == [1]
+        assert [b["charging_process_id"] for b in output._filtered_buckets()] == [1]
+
+        output.car_id = 2
+        assert [s["id"] for s in output._filtered_sessions()] == [2]
+        assert [b["charging_process_id"] for b in output._filtered_buckets()] == [2]
+
+
+# ---------------------------------------------------------------------------
+# get_webapp_data cache
+# ---------------------------------------------------------------------------
+
+class TestWebappCache:
+    def test_run_ending_refreshes_payload(self, clock):
+        now = clock.now()
+        data = _charge_data(
+            sessions=[_session(start=now - dt.timedelta(minutes=30), end=None)],
+            buckets=[_bucket(start=now - dt.timedelta(minutes=10))],
+        )
+        output = _make_output(data)
+        first = output.get_webapp_data(None)
+        assert first["is_on"] is True
+
+        # No new buckets for more than 20 minutes, so the run is no longer current
+        clock.advance(minutes=20)
+        second = output.get_webapp_data(None)
+        assert second["is_on"] is False
+        assert second["reason"] == "Not charging"
+
+    def test_day_rollover_refreshes_payload(self, clock):
+        output = _make_output(_charge_data())
+        assert output.get_webapp_data(None)["actual_energy_used"] == "1.500kWh"
+
+        # Nothing else changes, but today's totals are now for a day with no charging
+        clock.advance(days=1)
+        assert output.get_webapp_data(None)["actual_energy_used"] == "0.000kWh"
+
+    def test_caller_changes_do_not_leak_into_cache(self, clock):
+        output = _make_output(_charge_data())
+        first = output.get_webapp_data(None)
+        first["name"] = "Changed"
+
+        assert output.get_webapp_data(None)["name"] == "Tesla"
@@ -1,6 +1,9 @@
 """Tests for UPSIntegration — UPS health monitoring and status reporting."""
 
+import datetime as dt
+import socket
 import sys
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock
 
@@ -10,7 +13,8 @@ SRC_DIR = Path(__file__).resolve().parents[1] / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from ups_integration import UPSIntegration
+import ups_integration
+from ups_integration import UPSIntegration, _NUTClient
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -23,13 +27,13 @@ def _make_logger():
     return m
 
 
-def _make_config(enable: bool = True, devices: list | None = None):
+def _make_config(enable: bool = True, devices: list | None = None, data_file: str | None = None):
     """Build a mock SCConfigManager that returns a UPSIntegration config."""
     cfg = MagicMock()
     ups_conf = {
         "Enable": enable,
         "PollingInterval": 30,
-        "DataFile": None,
+        "DataFile": data_file,
         "DataFileWriteInterval": 60,
         "DataFileMaxDays": 3,
         "UPSDevices": devices or [],
@@ -44,8 +48,51 @@ def _make_config(enable: bool = True, devices: list | None = None):
     return cfg
 
 
-def _make_ups(enable=True, devices=None) -> UPSIntegration:
-    return UPSIntegration(_make_config(enable=enable, devices=devices), _make_logger())
+class _FakeUpsd:
+    """A local NUT daemon that answers GET VAR requests with canned reply lines, one connection at a time."""
+
+    def __init__(self, replies: dict[str, bytes]):
+        self.replies = replies
+        self.connections = 0
+        self.drop_next = False  # Close the connection instead of answering the next request
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.device = f"apc@127.0.0.1:{self._server.getsockname()[1]}"
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with conn, conn.makefile("rb") as reader:
+                for request in reader:
+                    if self.drop_next:
+                        self.drop_next = False
+                        break
+                    conn.sendall(self.replies[request.decode().split()[-1]] + b"\n")
+
+    def close(self) -> None:
+        self._server.close()
+
+
+@pytest.fixture
+def upsd():
+    server = _FakeUpsd({
+        "battery.charge": b'VAR apc battery.charge "95"',
+        "battery.runtime": b"ERR VAR-NOT-SUPPORTED",
+        "ups.status": b'VAR apc ups.status "OL CHRG"',
+        "ups.mfr": b'VAR apc ups.mfr "Say \\"hi\\" \\\\ bye"',
+        "ups.model": b'VAR apc ups.model "\xff"',
+        "ups.serial": b"ERR ACCESS-DENIED",
+    })
+    yield server
+    server.close()
+
+
+def _make_ups(enable=True, devices=None, data_file=None) -> UPSIntegration:
+    return UPSIntegration(_make_config(enable=enable, devices=devices, data_file=data_file), _make_logger())
 
 
 def _ups_entry(
@@ -105,6 +152,30 @@ class TestInitialisation:
         ups = _make_ups(enable=True, devices=devices)
         assert ups.ups_list == []
 
+    def test_absolute_script_command_resolved_once(self):
+        devices = [{"Name": "APC UPS", "Script": "/usr/local/bin/ups_status.sh --json"}]
+        ups = _make_ups(enable=True, devices=devices)
+        assert ups.ups_list[0]["command"] == ["/usr/local/bin/ups_status.sh", "--json"]
+
+    def test_relative_script_command_resolved_from_project_root(self):
+        command = UPSIntegration._resolve_script_command("scripts/ups.sh apc", Path("/opt/powercontroller"))
+        assert command == [str(Path("/opt/powercontroller") / "scripts/ups.sh"), "apc"]
+
+    def test_blank_script_command_is_none(self):
+        assert UPSIntegration._resolve_script_command("   ", Path("/opt/powercontroller")) is None
+
+    def test_nut_device_without_script(self):
+        devices = [{"Name": "APC UPS", "NUTDevice": "apc@10.0.0.5:3500"}]
+        ups = _make_ups(enable=True, devices=devices)
+        nut = ups.ups_list[0]["nut"]
+        assert nut.ups_name == "apc"
+        assert nut.address == ("10.0.0.5", 3500)
+
+    def test_invalid_nut_device_skipped(self):
+        devices = [{"Name": "APC UPS", "NUTDevice": "@localhost"}]
+        ups = _make_ups(enable=True, devices=devices)
+        assert ups.ups_list == []
+
 
 # ---------------------------------------------------------------------------
 # is_ups_healthy — before any reading
@@ -247,3 +318,205 @@ class TestUpdateUpsHealthStatus:
         entry = _ups_entry(battery_state="discharging", charge=1, runtime=1,
                            min_charge_discharging=0, min_runtime_discharging=0)
         assert self._check(entry) is True
+
+    def test_warning_logged_only_on_transition(self):
+        devices = [{"Name": "APC UPS", "Script": "echo '{}'", "MinChargeWhenDischarging": 50}]
+        ups = _make_ups(enable=True, devices=devices)
+        entry = ups.ups_list[0]
+
+        def _warnings():
+            return [call for call in ups.logger.log_message.call_args_list if call.args[1] == "warning"]
+
+        for charge in (40, 40, 35, 30):
+            entry.update(battery_state="discharging", battery_charge_percent=charge, battery_runtime_seconds=600)
+            ups._update_ups_health_status(entry)
+            assert entry["is_healthy"] is False
+        assert len(_warnings()) == 1
+
+        entry.update(battery_state="charging", battery_charge_percent=60)
+        ups._update_ups_health_status(entry)
+        assert entry["is_healthy"] is True
+        assert len(_warnings()) == 1
+
+
+# ---------------------------------------------------------------------------
+# read_ups_data
+# ---------------------------------------------------------------------------
+
+class TestReadUpsData:
+    def test_single_device_runs_without_pool(self):
+        devices = [{"Name": "APC UPS", "Script": "echo '{}'"}]
+        ups = _make_ups(enable=True, devices=devices)
+        assert ups._pool is None
+
+    def test_all_devices_polled_in_parallel(self):
+        devices = [
+            {"Name": "UPS 1", "Script": "echo '{}'"},
+            {"Name": "UPS 2", "Script": "echo '{}'"},
+            {"Name": "UPS 3", "Script": "echo '{}'"},
+        ]
+        ups = _make_ups(enable=True, devices=devices)
+        assert ups._pool is not None
+        ups._execute_ups_script = MagicMock()
+
+        ups.read_ups_data()
+
+        polled = sorted(call.args[0]["name"] for call in ups._execute_ups_script.call_args_list)
+        assert polled == ["UPS 1", "UPS 2", "UPS 3"]
+        ups.close()
+        assert ups._pool is None
+
+    def test_script_error_is_logged_not_raised(self):
+        devices = [
+            {"Name": "UPS 1", "Script": "echo '{}'"},
+            {"Name": "UPS 2", "Script": "echo '{}'"},
+        ]
+        ups = _make_ups(enable=True, devices=devices)
+        ups._execute_ups_script = MagicMock(side_effect=OSError("boom"))
+
+        ups.read_ups_data()
+
+        errors = [call for call in ups.logger.log_message.call_args_list if call.args[1] == "error"]
+        assert len(errors) == 2
+        ups.close()
+
+
+# ---------------------------------------------------------------------------
+# UPS data file
+# ---------------------------------------------------------------------------
+
+# Recent enough that the readings aren't trimmed as older than DataFileMaxDays
+BASE_TIME = dt.datetime.now().astimezone().replace(microsecond=0) - dt.timedelta(hours=2)
+
+
+class TestDataFile:
+    @staticmethod
+    def _write(ups: UPSIntegration, now_monotonic: float, charge: float) -> None:
+        entry = ups.ups_list[0]
+        entry["timestamp"] = BASE_TIME + dt.timedelta(seconds=now_monotonic)
+        entry["battery_state"] = "charging"
+        entry["battery_charge_percent"] = charge
+        entry["battery_runtime_seconds"] = 1200.0
+        ups._write_ups_data_to_csv(now_monotonic)
+
+    def test_rows_appended_between_trims(self, tmp_path):
+        data_file = tmp_path / "ups_data.csv"
+        ups = _make_ups(enable=True, devices=[{"Name": "APC UPS", "Script": "echo '{}'"}], data_file=str(data_file))
+
+        self._write(ups, 1000.0, 90.0)
+        assert ups._csv_reader is not None
+        ups._csv_reader.update_csv_file = MagicMock(wraps=ups._csv_reader.update_csv_file)
+        ups._csv_reader.write_csv = MagicMock(wraps=ups._csv_reader.write_csv)
+
+        self._write(ups, 1060.0, 91.0)
+        self._write(ups, 1120.0, 92.0)
+        ups._csv_reader.update_csv_file.assert_not_called()
+        ups._csv_reader.write_csv.assert_not_called()
+
+        lines = data_file.read_text(encoding="utf-8").splitlines()
+        assert lines[0] == "Timestamp,UPSName,BatteryChargePercent,BatteryRuntimeSeconds,BatteryState,IsHealthy"
+        assert lines[1:] == [
+            f"{(BASE_TIME + dt.timedelta(seconds=seconds)):%Y-%m-%d %H:%M:%S},APC UPS,{charge},1200.0,charging,True"
+            for seconds, charge in ((1000, 90.0), (1060, 91.0), (1120, 92.0))
+        ]
+
+        rows = ups._csv_reader.read_csv()
+        assert rows is not None
+        assert [row["BatteryChargePercent"] for row in rows] == [90.0, 91.0, 92.0]
+
+    def test_file_trimmed_after_trim_interval(self, tmp_path):
+        ups = _make_ups(enable=True, devices=[{"Name": "APC UPS", "Script": "echo '{}'"}], data_file=str(tmp_path / "ups_data.csv"))
+
+        self._write(ups, 1000.0, 90.0)
+        assert ups._csv_reader is not None
+        ups._csv_reader.update_csv_file = MagicMock(wraps=ups._csv_reader.update_csv_file)
+
+        self._write(ups, 1000.0 + ups_integration.CSV_TRIM_INTERVAL, 91.0)
+        ups._csv_reader.update_csv_file.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# NUT daemon readings
+# ---------------------------------------------------------------------------
+
+class TestNutDevice:
+    @pytest.mark.parametrize(
+        ("status", "charge", "expected"),
+        [
+            ("OL", 100.0, "charged"),
+            ("OL", 95.0, "charging"),
+            ("OL CHRG", 95.0, "charging"),
+            ("OB DISCHRG", 80.0, "discharging"),
+            ("OB", 80.0, "discharging"),
+            ("OL BOOST", 100.0, "unknown"),
+            (None, None, "unknown"),
+        ],
+    )
+    def test_battery_state_mapping(self, status, charge, expected):
+        assert UPSIntegration._nut_battery_state(status, charge) == expected
+
+    def test_var_replies_parsed_over_one_connection(self, upsd):
+        client = _NUTClient(upsd.device)
+        assert client.get_vars(("battery.charge", "ups.status")) == {"battery.charge": "95", "ups.status": "OL CHRG"}
+        assert client.get_vars(("battery.charge",)) == {"battery.charge": "95"}
+        assert upsd.connections == 1
+        client.close()
+
+    def test_escaped_value_unquoted(self, upsd):
+        client = _NUTClient(upsd.device)
+        assert client.get_vars(("ups.mfr",)) == {"ups.mfr": 'Say "hi" \\ bye'}
+        client.close()
+
+    def test_unsupported_var_is_none(self, upsd):
+        client = _NUTClient(upsd.device)
+        assert client.get_vars(("battery.runtime",)) == {"battery.runtime": None}
+        client.close()
+
+    def test_other_error_raises_and_disconnects(self, upsd):
+        client = _NUTClient(upsd.device)
+        with pytest.raises(ConnectionError, match="ERR ACCESS-DENIED"):
+            client.get_vars(("ups.serial",))
+        assert client._sock is None
+
+    def test_undecodable_reply_raises_connection_error(self, upsd):
+        client = _NUTClient(upsd.device)
+        with pytest.raises(ConnectionError, match="Invalid reply"):
+            client.get_vars(("ups.model",))
+        assert client._sock is None
+
+    def test_reconnects_after_dropped_connection(self, upsd):
+        client = _NUTClient(upsd.device)
+        assert client.get_vars(("battery.charge",)) == {"battery.charge": "95"}
+
+        upsd.drop_next = True
+        with pytest.raises(ConnectionError, match="closed"):
+            client.get_vars(("battery.charge",))
+
+        assert client.get_vars(("battery.charge",)) == {"battery.charge": "95"}
+        assert upsd.connections == 2
+        client.close()
+
+    def test_failed_read_is_logged_not_raised(self, upsd):
+        upsd.replies["battery.charge"] = b'VAR apc battery.charge "\xff"'
+        ups = _make_ups(enable=True, devices=[{"Name": "APC UPS", "NUTDevice": upsd.device}])
+
+        ups.read_ups_data()
+
+        errors = [call for call in ups.logger.log_message.call_args_list if call.args[1] == "error"]
+        assert len(errors) == 1
+        assert ups.ups_list[0]["battery_state"] is None
+        ups.close()
+
+    def test_reading_updates_entry(self):
+        devices = [{"Name": "APC UPS", "NUTDevice": "apc@localhost", "MinChargeWhenDischarging": 50}]
+        ups = _make_ups(enable=True, devices=devices)
+        entry = ups.ups_list[0]
+        entry["nut"] = MagicMock()
+        entry["nut"].get_vars.return_value = {"battery.charge": "40", "battery.runtime": "1200", "ups.status": "OB DISCHRG"}
+
+        ups.read_ups_data()
+
+        assert entry["battery_state"] == "discharging"
+        assert entry["battery_charge_percent"] == 40
+        assert entry["battery_runtime_seconds"] == 1200
+        assert entry["is_healthy"] is False
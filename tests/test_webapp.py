@@ -9,9 +9,10 @@ Covers:
 """
 
 import asyncio
+import json
 import sys
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
@@ -20,7 +21,7 @@ SRC_DIR = Path(__file__).resolve().parents[1] / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from webapp import WebAppNotifier, create_asgi_app
+from webapp import ConnectionManager, SnapshotCache, WebAppNotifier, create_asgi_app
 
 # ---------------------------------------------------------------------------
 # Shared sample data
@@ -83,6 +84,7 @@ def _make_controller(webapp_data=None, valid_output_ids=None):
     valid_ids = valid_output_ids or {"network_rack"}
     ctrl.is_valid_output_id.side_effect = lambda oid: oid in valid_ids
     ctrl.post_command.return_value = None
+    ctrl.published_webapp_data = None
     return ctrl
 
 
@@ -148,6 +150,37 @@ class TestIndexPage:
         resp = client.get("/")
         assert resp.status_code != 403
 
+    def test_page_rendered_once_per_snapshot(self, logger):
+        ctrl = _make_controller()
+        ctrl.webapp_state_version = 1
+        app, _ = create_asgi_app(ctrl, _make_config(access_key=None), logger)
+        with TestClient(app) as c:
+            first = c.get("/")
+            assert first.status_code == 200
+            assert "Network Rack" in first.text
+
+            render = MagicMock(side_effect=AssertionError("page should come from the cache"))
+            app.state.templates.get_template = MagicMock(return_value=MagicMock(render=render))
+            assert c.get("/").text == first.text
+
+    def test_access_key_change_applied_after_config_reload(self, logger):
+        keys = {"current": "old-secret"}
+        cfg = MagicMock()
+        cfg.get.side_effect = lambda *k, default=None: keys["current"] if k == ("Website", "AccessKey") else default
+        ctrl = _make_controller()
+        ctrl.last_config_check = 1
+        app, _ = create_asgi_app(ctrl, cfg, logger)
+        with TestClient(app) as c:
+            assert c.get("/?key=old-secret").status_code != 403
+
+            # The cached key is kept until the controller reloads the config
+            keys["current"] = "new-secret"
+            assert c.get("/?key=old-secret").status_code != 403
+
+            ctrl.last_config_check = 2
+            assert c.get("/?key=old-secret").status_code == 403
+            assert c.get("/?key=new-secret").status_code != 403
+
 
 # ---------------------------------------------------------------------------
 # WebSocket /ws — initial snapshot
@@ -304,11 +337,143 @@ class TestWebAppNotifier:
         n = WebAppNotifier()
         n.notify()  # Should be a no-op, not raise
 
-    def test_bind_sets_loop_and_queue(self):
+    def test_bind_sets_loop_and_event(self):
         n = WebAppNotifier()
         loop = asyncio.new_event_loop()
-        q: asyncio.Queue = asyncio.Queue()
-        n.bind(loop, q)
+        event = asyncio.Event()
+        n.bind(loop, event)
         assert n.loop is loop
-        assert n.queue is q
+        assert n.event is event
+        loop.close()
+
+    def test_notify_sets_event(self):
+        n = WebAppNotifier()
+        loop = asyncio.new_event_loop()
+        event = asyncio.Event()
+        n.bind(loop, event)
+        n.notify()
+        n.notify()  # Repeated notifications coalesce
+        loop.run_until_complete(asyncio.sleep(0))
+        assert event.is_set()
         loop.close()
+
+
+# ---------------------------------------------------------------------------
+# ConnectionManager
+# ---------------------------------------------------------------------------
+
+class TestConnectionManager:
+    def test_broadcast_sends_to_all_and_drops_failed_clients(self):
+        async def _run():
+            manager = ConnectionManager()
+            good = AsyncMock()
+            bad = AsyncMock()
+            bad.send_text.side_effect = RuntimeError("closed")
+            await manager.connect(good)
+            await manager.connect(bad)
+
+            await manager.broadcast_text('{"type": "state_update", "state": {}}')
+            good.send_text.assert_awaited_once_with('{"type": "state_update", "state": {}}')
+            bad.send_text.assert_awaited_once()
+
+            # The failed client is no longer a broadcast target
+            await manager.broadcast_text('{"type": "state_update", "state": {}}')
+            assert good.send_text.await_count == 2
+            assert bad.send_text.await_count == 1
+
+        asyncio.run(_run())
+
+    def test_broadcast_sends_to_clients_concurrently(self):
+        async def _run():
+            manager = ConnectionManager()
+            second_started = asyncio.Event()
+
+            # The first client's send only completes once the second client's send has started,
+            # which can only happen if the sends run concurrently.
+            async def _slow_send(_text):
+                await second_started.wait()
+
+            async def _fast_send(_text):
+                second_started.set()
+
+            slow = AsyncMock()
+            slow.send_text.side_effect = _slow_send
+            fast = AsyncMock()
+            fast.send_text.side_effect = _fast_send
+            await manager.connect(slow)
+            await manager.connect(fast)
+
+            await asyncio.wait_for(manager.broadcast_text("{}"), timeout=1)
+            slow.send_text.assert_awaited_once_with("{}")
+            fast.send_text.assert_awaited_once_with("{}")
+
+        asyncio.run(_run())
+
+    def test_unexpected_send_error_is_raised(self):
+        async def _run():
+            manager = ConnectionManager()
+            ws = AsyncMock()
+            ws.send_text.side_effect = ValueError("bug")
+            await manager.connect(ws)
+
+            with pytest.raises(ValueError, match="bug"):
+                await manager.broadcast_text("{}")
+
+        asyncio.run(_run())
+
+
+# ---------------------------------------------------------------------------
+# SnapshotCache
+# ---------------------------------------------------------------------------
+
+class TestSnapshotCache:
+    def test_snapshot_rebuilt_only_when_version_changes(self):
+        ctrl = _make_controller()
+        ctrl.webapp_state_version = 1
+        cache = SnapshotCache(ctrl)
+
+        async def _run():
+            first = await cache.get()
+            second = await cache.get()
+            assert first is second
+            assert ctrl.get_webapp_data.call_count == 1
+
+            ctrl.webapp_state_version = 2
+            await cache.get()
+            assert ctrl.get_webapp_data.call_count == 2
+
+        asyncio.run(_run())
+
+    def test_message_encoded_once_per_snapshot(self):
+        ctrl = _make_controller()
+        ctrl.webapp_state_version = 1
+        cache = SnapshotCache(ctrl)
+
+        async def _run():
+            first = await cache.get_message()
+            assert json.loads(first) == {"type": "state_update", "state": SAMPLE_WEBAPP_DATA}
+            assert await cache.get_message() is first
+
+            ctrl.webapp_state_version = 2
+            ctrl.get_webapp_data.return_value = {"global": {}, "outputs": {}}
+            assert json.loads(await cache.get_message())["state"] == {"global": {}, "outputs": {}}
+
+        asyncio.run(_run())
+
+    def test_published_snapshot_used_when_current(self):
+        ctrl = _make_controller()
+        published = {"global": {}, "outputs": {}}
+        ctrl.webapp_state_version = 3
+        ctrl.published_webapp_data = (3, published)
+        cache = SnapshotCache(ctrl)
+
+        async def _run():
+            assert await cache.get() is published
+            ctrl.get_webapp_data.assert_not_called()
+
+            # Stale published snapshot falls back to building one
+            ctrl.webapp_state_version = 4
+            assert await cache.get() == SAMPLE_WEBAPP_DATA
+            assert ctrl.get_webapp_data.call_count == 1
+
+        asyncio.run(_run())